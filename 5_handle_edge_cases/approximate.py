@@ -0,0 +1,100 @@
+from statistics import NormalDist
+from typing import Literal
+import numpy as np
+import pandas as pd
+
+
+def sample_positions(
+    n_values: int, sample_size: int, rng: np.random.Generator
+) -> np.ndarray:
+    # Sorted positions of a uniform sample without replacement
+    if n_values <= sample_size:
+        return np.arange(n_values)
+    return np.sort(rng.choice(n_values, size=sample_size, replace=False, shuffle=False))
+
+
+def stratified_sample(
+    codes: np.ndarray, sizes: np.ndarray, sample_size: int, rng: np.random.Generator
+) -> np.ndarray:
+    # Positions of about sample_size rows per group. Every row is kept with
+    # probability sample_size / group size, which needs no sort, and groups
+    # with at most sample_size rows are kept whole.
+    rates = np.minimum(1.0, sample_size / np.maximum(sizes, 1))
+    observed = codes >= 0
+    keep = observed & (rng.random(len(codes)) < rates[np.where(observed, codes, 0)])
+    return np.flatnonzero(keep)
+
+
+def get_confidence_bounds(
+    values: np.ndarray,
+    codes: np.ndarray,
+    population_sizes: np.ndarray,
+    statistics: np.ndarray,
+    strategy: Literal["most_frequent", "median", "mean"],
+    confidence: float = 0.95,
+) -> pd.DataFrame:
+    # Normal-approximation bounds from the non-missing sampled values of each
+    # group, with the finite population correction, so groups that were not
+    # sampled get zero-width bounds. Mean and median bound the statistic
+    # itself; most_frequent bounds the population share of the chosen value.
+    n_groups = len(population_sizes)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    sample_sizes = np.bincount(codes, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correction = np.sqrt(
+            np.clip(
+                (population_sizes - sample_sizes) / np.maximum(population_sizes - 1, 1),
+                0,
+                1,
+            )
+        )
+        if strategy in ("mean", "median"):
+            statistics = statistics.astype(float)
+        if strategy == "mean":
+            deviations = (
+                pd.Series(values.astype(float)).groupby(codes).std().reindex(range(n_groups))
+            )
+            half_width = z * deviations.to_numpy() / np.sqrt(sample_sizes) * correction
+            half_width = np.where(sample_sizes == population_sizes, 0.0, half_width)
+            lower = statistics - half_width
+            upper = statistics + half_width
+        elif strategy == "median":
+            lower, upper = _median_bounds(
+                values.astype(float), codes, sample_sizes, z * correction
+            )
+            exact = sample_sizes == population_sizes
+            lower = np.where(exact, statistics, lower)
+            upper = np.where(exact, statistics, upper)
+        else:
+            matches = pd.Series(values).to_numpy() == statistics[codes]
+            shares = np.bincount(codes[matches], minlength=n_groups) / sample_sizes
+            half_width = z * np.sqrt(shares * (1 - shares) / sample_sizes) * correction
+            lower = np.clip(shares - half_width, 0, 1)
+            upper = np.clip(shares + half_width, 0, 1)
+    return pd.DataFrame(
+        {
+            "lower": lower,
+            "upper": upper,
+            "sample_size": sample_sizes,
+            "population_size": population_sizes,
+            "exact": sample_sizes == population_sizes,
+        }
+    )
+
+
+def _median_bounds(
+    values: np.ndarray, codes: np.ndarray, sample_sizes: np.ndarray, z: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    # Distribution-free interval between the order statistics at ranks
+    # n / 2 -+ z * sqrt(n) / 2 of each group's sorted sample
+    values = values[np.lexsort((values, codes))]
+    starts = np.cumsum(sample_sizes) - sample_sizes
+    spread = z * np.sqrt(sample_sizes) / 2
+    lower_ranks = np.clip(np.floor(sample_sizes / 2 - spread), 0, sample_sizes - 1)
+    upper_ranks = np.clip(np.ceil(sample_sizes / 2 + spread), 0, sample_sizes - 1)
+    has_values = sample_sizes > 0
+    lower = np.full(len(sample_sizes), np.nan)
+    upper = np.full(len(sample_sizes), np.nan)
+    lower[has_values] = values[(starts + lower_ranks)[has_values].astype(np.intp)]
+    upper[has_values] = values[(starts + upper_ranks)[has_values].astype(np.intp)]
+    return lower, upper
@@ -0,0 +1,191 @@
+import argparse
+import importlib
+from pathlib import Path
+from typing import Literal, Optional
+import pandas as pd
+from downcast import DowncastReport, downcast_dtypes
+from process_data import (
+    DataFrameImputer,
+    get_default_imputers,
+    impute_missing_values,
+    load_imputers,
+    transform_missing_values,
+)
+
+Format = Literal["csv", "parquet", "feather"]
+# Feather v2 files are Arrow IPC files, so both are read and written as feather
+SUFFIX_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+}
+
+
+def get_format(path: str, format: Optional[Format] = None) -> Format:
+    if format is not None:
+        return format
+    suffix = Path(path).suffix.lower()
+    if suffix not in SUFFIX_FORMATS:
+        raise ValueError(f"Cannot infer the file format of {path}")
+    return SUFFIX_FORMATS[suffix]
+
+
+def _import_pyarrow(module: str):
+    try:
+        return importlib.import_module(f"pyarrow.{module}")
+    except ImportError as error:
+        raise ImportError(
+            "Parquet and Feather files need pyarrow, "
+            "install it with: pip install 'refactor-function[io]'"
+        ) from error
+
+
+def read_schema(path: str, format: Optional[Format] = None) -> pd.DataFrame:
+    # Empty frame with the file's columns and dtypes. Parquet and Feather
+    # store their schema, which is read without the data. CSV has none, so
+    # the whole file is parsed: a column that is empty in its first rows
+    # would otherwise be typed as float. read_csv infers each column alone,
+    # so a later read of some columns gets the same dtypes.
+    format = get_format(path, format)
+    if format == "csv":
+        return pd.read_csv(path).iloc[:0]
+    if format == "parquet":
+        schema = _import_pyarrow("parquet").read_schema(path)
+    else:
+        with _import_pyarrow("ipc").open_file(path) as reader:
+            schema = reader.schema
+    return schema.empty_table().to_pandas()
+
+
+def read_frame(
+    path: str,
+    columns: Optional[list[str]] = None,
+    memory_map: bool = False,
+    format: Optional[Format] = None,
+) -> pd.DataFrame:
+    # Columnar formats only read the projected columns from disk
+    format = get_format(path, format)
+    if format == "csv":
+        return pd.read_csv(path, usecols=columns)
+    if format == "parquet":
+        table = _import_pyarrow("parquet").read_table(
+            path, columns=columns, memory_map=memory_map
+        )
+    else:
+        table = _import_pyarrow("feather").read_table(
+            path, columns=columns, memory_map=memory_map
+        )
+    return table.to_pandas()
+
+
+def write_frame(df: pd.DataFrame, path: str, format: Optional[Format] = None):
+    format = get_format(path, format)
+    if format == "csv":
+        df.to_csv(path, index=False)
+        return
+    # pandas writes through pyarrow; checked here so the error names the extra
+    _import_pyarrow(format)
+    if format == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(path)
+
+
+def get_required_features(
+    imputers: list[DataFrameImputer], columns: list[str]
+) -> list[str]:
+    # Columns read or written by the imputers, in file order. Imputers that
+    # do not declare their columns need all of them.
+    required = set()
+    for imputer in imputers:
+        if imputer.read_features is None or imputer.write_features is None:
+            return list(columns)
+        required.update(imputer.read_features)
+        required.update(imputer.write_features)
+    return [column for column in columns if column in required]
+
+
+def impute_file(
+    input_path: str,
+    output_path: str,
+    imputers: Optional[list[DataFrameImputer]] = None,
+    pass_through: Optional[list[str]] = None,
+    all_columns: bool = False,
+    memory_map: bool = False,
+    input_format: Optional[Format] = None,
+    output_format: Optional[Format] = None,
+    downcast_report: Optional[DowncastReport] = None,
+    fit: bool = True,
+) -> pd.DataFrame:
+    # Without imputers, the default pipeline is built from the file's schema.
+    # With a downcast_report, numeric columns are downcast before imputing.
+    # With fit=False, fitted imputers, e.g. from load_imputers, only transform.
+    schema = read_schema(input_path, input_format)
+    if imputers is None:
+        imputers = get_default_imputers(schema)
+    columns = list(schema.columns)
+    if not all_columns:
+        required = set(get_required_features(imputers, columns))
+        required.update(pass_through or [])
+        columns = [column for column in columns if column in required]
+    df = read_frame(input_path, columns, memory_map=memory_map, format=input_format)
+    if downcast_report is not None:
+        df = downcast_dtypes(df, imputers, report=downcast_report)
+    if fit:
+        df = impute_missing_values(df, imputers)
+    else:
+        df = transform_missing_values(df, imputers)
+    write_frame(df, output_path, output_format)
+    return df
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Impute the missing values of a CSV, Parquet or Feather file"
+    )
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument(
+        "--imputers", help="Pickle written by save_imputers, default pipeline if unset"
+    )
+    parser.add_argument(
+        "--pass-through",
+        nargs="+",
+        default=[],
+        help="Columns to keep in the output although no imputer uses them",
+    )
+    parser.add_argument("--all-columns", action="store_true")
+    parser.add_argument("--memory-map", action="store_true")
+    parser.add_argument(
+        "--downcast",
+        action="store_true",
+        help="Downcast numeric columns to the smallest safe dtype before imputing",
+    )
+    parser.add_argument("--input-format", choices=["csv", "parquet", "feather"])
+    parser.add_argument("--output-format", choices=["csv", "parquet", "feather"])
+    args = parser.parse_args(argv)
+
+    imputers = load_imputers(args.imputers) if args.imputers else None
+    downcast_report = DowncastReport() if args.downcast else None
+    df = impute_file(
+        args.input,
+        args.output,
+        imputers,
+        pass_through=args.pass_through,
+        all_columns=args.all_columns,
+        memory_map=args.memory_map,
+        input_format=args.input_format,
+        output_format=args.output_format,
+        downcast_report=downcast_report,
+        fit=imputers is None,
+    )
+    if downcast_report is not None:
+        print(downcast_report)
+    print(f"Wrote {len(df)} rows and {len(df.columns)} columns to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
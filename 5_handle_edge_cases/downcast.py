@@ -0,0 +1,145 @@
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_number
+from process_data import ConstantImputer, DataFrameImputer
+
+# Smallest first, so the first one that holds the range wins
+INTEGER_DTYPES = [
+    np.dtype(dtype)
+    for dtype in (np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32)
+]
+# Integers are exact in float32 up to 2**24, and the medians of integers,
+# which may end in .5, up to 2**23
+MAX_EXACT_MEDIAN = 2**23
+
+
+@dataclass
+class DowncastReport:
+    # Columns that were downcast, as {column: [old dtype, new dtype]}, and the
+    # memory of the frame's columns before and after, without the index
+    dtypes: dict = field(default_factory=dict)
+    memory_before: int = 0
+    memory_after: int = 0
+
+    @property
+    def memory_saved(self) -> int:
+        return self.memory_before - self.memory_after
+
+    def __str__(self) -> str:
+        return (
+            f"Downcast {len(self.dtypes)} columns, saving {self.memory_saved} of "
+            f"{self.memory_before} bytes"
+        )
+
+    def summary(self) -> dict:
+        return {
+            "columns": len(self.dtypes),
+            "memory_before_bytes": self.memory_before,
+            "memory_after_bytes": self.memory_after,
+            "memory_saved_bytes": self.memory_saved,
+            "dtypes": self.dtypes,
+        }
+
+
+def _get_fills(imputers: list[DataFrameImputer]) -> tuple[dict, dict, Optional[str]]:
+    # Constant fill values per column, the strategy of computed fills per
+    # column, and the computed fill of columns no imputer declares
+    constants = {}
+    computed = {}
+    default = None
+    for imputer in imputers:
+        if isinstance(imputer, ConstantImputer):
+            for feature in imputer.write_features:
+                constants.setdefault(feature, []).append(imputer.fill_value)
+            continue
+        # Imputers without a strategy may fill any value
+        strategy = getattr(imputer, "strategy", None) or "unknown"
+        if imputer.write_features is None:
+            default = "unknown"
+            continue
+        for feature in imputer.write_features:
+            if strategy != "most_frequent":
+                computed[feature] = strategy
+    return constants, computed, default
+
+
+def get_safe_dtype(
+    values: pd.Series, fill_values: list = (), computed_fill: Optional[str] = None
+) -> np.dtype:
+    # The smallest dtype that holds every value and every fill value exactly,
+    # so filling never casts the column back up. most_frequent fills are
+    # values of the column and always fit. float16 is not used, since pandas
+    # upcasts it in most operations.
+    dtype = values.dtype
+    if not isinstance(dtype, np.dtype) or dtype.kind not in "iuf":
+        return dtype
+    if any(not is_number(value) or isinstance(value, bool) for value in fill_values):
+        return dtype
+    observed = values.to_numpy()
+    if dtype.kind == "f":
+        observed = observed[~np.isnan(observed)]
+    if not len(observed):
+        return dtype
+    candidates = np.asarray(fill_values, dtype=np.float64)
+    low = min(observed.min(), candidates.min(initial=np.inf))
+    high = max(observed.max(), candidates.max(initial=-np.inf))
+    if dtype.kind in "iu":
+        if not np.array_equal(candidates, np.round(candidates)):
+            return dtype
+        for candidate in INTEGER_DTYPES:
+            info = np.iinfo(candidate)
+            if candidate.itemsize < dtype.itemsize and info.min <= low and high <= info.max:
+                return candidate
+        return dtype
+    if dtype.itemsize <= 4 or computed_fill not in (None, "median"):
+        # Means are rarely exact in float32
+        return dtype
+    with np.errstate(over="ignore"):
+        for array in (observed, candidates):
+            if not np.array_equal(array.astype(np.float32).astype(np.float64), array):
+                return dtype
+    if computed_fill == "median" and not (
+        np.array_equal(observed, np.round(observed))
+        and max(abs(low), abs(high)) < MAX_EXACT_MEDIAN
+    ):
+        return dtype
+    return np.dtype(np.float32)
+
+
+def plan_downcast(
+    df: pd.DataFrame, imputers: Optional[list[DataFrameImputer]] = None
+) -> dict:
+    # New dtypes of the numeric columns that can be downcast before imputers
+    # fill them
+    constants, computed, default = _get_fills(imputers or [])
+    dtypes = {}
+    for feature, dtype in df.dtypes.items():
+        safe = get_safe_dtype(
+            df[feature], constants.get(feature, []), computed.get(feature, default)
+        )
+        if safe != dtype:
+            dtypes[feature] = safe
+    return dtypes
+
+
+def downcast_dtypes(
+    df: pd.DataFrame,
+    imputers: Optional[list[DataFrameImputer]] = None,
+    inplace: bool = True,
+    report: Optional[DowncastReport] = None,
+) -> pd.DataFrame:
+    if not inplace:
+        df = df.copy()
+    dtypes = plan_downcast(df, imputers)
+    memory_before = int(df.memory_usage(index=False).sum())
+    for feature, dtype in dtypes.items():
+        old_dtype = df[feature].dtype
+        df[feature] = df[feature].astype(dtype)
+        if report is not None:
+            report.dtypes[str(feature)] = [str(old_dtype), str(dtype)]
+    if report is not None:
+        report.memory_before += memory_before
+        report.memory_after += int(df.memory_usage(index=False).sum())
+    return df
@@ -0,0 +1,191 @@
+from typing import Iterable, Literal, Optional, Union
+import pandas as pd
+from process_data import (
+    DataFrameImputer,
+    GroupStatisticImputer,
+    MissingIndex,
+    NumberOrStr,
+    StatisticsImputer,
+)
+from sufficient_statistics import SufficientStatistics
+
+
+class _LazyStatistics:
+    # statistics_ is computed from the state when it is first read after an
+    # update, so a run of partial_fit calls costs O(batch) each and the
+    # statistics are only computed once, at transform or merge time
+    _statistics = None
+    _stale = False
+
+    @property
+    def statistics_(self):
+        if self._stale:
+            self._statistics = self._statistics_from_state()
+            self._stale = False
+        return self._statistics
+
+    @statistics_.setter
+    def statistics_(self, statistics):
+        self._statistics = statistics
+        self._stale = False
+
+
+class IncrementalGroupStatisticImputer(_LazyStatistics, GroupStatisticImputer):
+    # Keeps mergeable per-group state, so new batches update the fitted
+    # statistics in O(batch) instead of refitting on the whole history.
+    # max_centroids bounds the median state, see SufficientStatistics.
+    def __init__(
+        self,
+        strategy: Literal["most_frequent", "median", "mean"],
+        group_feature: Union[str, list[str]],
+        target_feature: Union[str, list[str]],
+        max_centroids: Optional[int] = None,
+    ):
+        super().__init__(strategy, group_feature, target_feature)
+        self.max_centroids = max_centroids
+        self.states_ = self._new_states()
+
+    def impute(
+        self,
+        df: pd.DataFrame,
+        inplace: bool = True,
+        missing_index: Optional[MissingIndex] = None,
+        group_indexes: Optional[dict] = None,
+    ) -> pd.DataFrame:
+        return self.fit(df).transform(df, inplace=inplace, missing_index=missing_index)
+
+    def fit(self, df: pd.DataFrame) -> "IncrementalGroupStatisticImputer":
+        self.states_ = self._new_states()
+        return self.partial_fit(df)
+
+    def partial_fit(self, df: pd.DataFrame) -> "IncrementalGroupStatisticImputer":
+        self._check_group_feature(df)
+        # Several group features are kept as one tuple key per row
+        if len(self.group_features) == 1:
+            groups = df[self.group_features[0]]
+        else:
+            groups = pd.Series(
+                pd.MultiIndex.from_frame(df[self.group_features]).to_flat_index(),
+                index=df.index,
+            )
+        for target, state in self.states_.items():
+            state.update(df[target], groups)
+        self._stale = True
+        return self
+
+    def merge(
+        self, other: "IncrementalGroupStatisticImputer"
+    ) -> "IncrementalGroupStatisticImputer":
+        if (other.group_features, other.target_features) != (
+            self.group_features,
+            self.target_features,
+        ):
+            raise ValueError("Cannot merge imputers fitted on different features")
+        merged = IncrementalGroupStatisticImputer(
+            self.strategy, self.group_feature, self.target_feature, self.max_centroids
+        )
+        merged.states_ = {
+            target: state.merge(other.states_[target])
+            for target, state in self.states_.items()
+        }
+        merged._stale = True
+        return merged
+
+    def _new_states(self) -> dict[str, SufficientStatistics]:
+        return {
+            target: SufficientStatistics(self.strategy, self.max_centroids)
+            for target in self.target_features
+        }
+
+    def _statistics_from_state(self) -> Union[pd.Series, pd.DataFrame]:
+        # Same layout as GroupStatisticImputer: a Series for a single target,
+        # a frame with one column per target otherwise, and a MultiIndex for
+        # several group features
+        statistics = {}
+        for target, state in self.states_.items():
+            values = state.result()
+            if len(self.group_features) > 1:
+                values.index = pd.MultiIndex.from_tuples(
+                    list(values.index), names=self.group_features
+                )
+            statistics[target] = values
+        if isinstance(self.target_feature, str):
+            return statistics[self.target_feature]
+        return pd.DataFrame(statistics)
+
+
+class IncrementalStatisticsImputer(_LazyStatistics, StatisticsImputer):
+    def __init__(
+        self,
+        features: Iterable[NumberOrStr],
+        strategy: Literal["most_frequent", "median", "mean"],
+        max_centroids: Optional[int] = None,
+    ):
+        super().__init__(features, strategy)
+        self.max_centroids = max_centroids
+        self.states_ = self._new_states()
+
+    def impute(
+        self,
+        df: pd.DataFrame,
+        inplace: bool = True,
+        missing_index: Optional[MissingIndex] = None,
+    ) -> pd.DataFrame:
+        return self.fit(df).transform(df, inplace=inplace, missing_index=missing_index)
+
+    def fit(self, df: pd.DataFrame) -> "IncrementalStatisticsImputer":
+        self.states_ = self._new_states()
+        return self.partial_fit(df)
+
+    def partial_fit(self, df: pd.DataFrame) -> "IncrementalStatisticsImputer":
+        for feature, state in self.states_.items():
+            state.update(df[feature])
+        self._stale = True
+        return self
+
+    def merge(
+        self, other: "IncrementalStatisticsImputer"
+    ) -> "IncrementalStatisticsImputer":
+        if other.features != self.features:
+            raise ValueError("Cannot merge imputers fitted on different features")
+        merged = IncrementalStatisticsImputer(
+            self.features, self.strategy, self.max_centroids
+        )
+        merged.states_ = {
+            feature: state.merge(other.states_[feature])
+            for feature, state in self.states_.items()
+        }
+        merged._stale = True
+        return merged
+
+    def _new_states(self) -> dict[str, SufficientStatistics]:
+        return {
+            feature: SufficientStatistics(self.strategy, self.max_centroids)
+            for feature in self.features
+        }
+
+    def _statistics_from_state(self) -> pd.Series:
+        return pd.Series(
+            {feature: state.global_result() for feature, state in self.states_.items()},
+            index=self.features,
+            dtype=object,
+        )
+
+
+def to_incremental(
+    imputer: DataFrameImputer, max_centroids: Optional[int] = None
+) -> DataFrameImputer:
+    if isinstance(imputer, GroupStatisticImputer):
+        if imputer.fallback or imputer.min_group_size != 1:
+            raise ValueError("Fallback groups have no incremental variant")
+        return IncrementalGroupStatisticImputer(
+            imputer.strategy,
+            imputer.group_feature,
+            imputer.target_feature,
+            max_centroids,
+        )
+    if isinstance(imputer, StatisticsImputer):
+        return IncrementalStatisticsImputer(
+            imputer.features, imputer.strategy, max_centroids
+        )
+    raise ValueError(f"{type(imputer).__name__} has no incremental variant")
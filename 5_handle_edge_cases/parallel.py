@@ -0,0 +1,118 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Literal
+import pandas as pd
+from planner import _is_sampled, _with_features
+from process_data import DataFrameImputer, ConstantImputer, StatisticsImputer
+
+
+def _shard_imputer(imputer: DataFrameImputer, n_shards: int) -> list[DataFrameImputer]:
+    # Column-wise imputers fill each column independently, so they can be split
+    # into smaller imputers over disjoint column blocks
+    if type(imputer) not in (ConstantImputer, StatisticsImputer) or _is_sampled(
+        imputer
+    ):
+        return [imputer]
+    features = imputer.features
+    size = max(1, -(-len(features) // n_shards))
+    return [
+        _with_features(imputer, features[start : start + size])
+        for start in range(0, len(features), size)
+    ]
+
+
+def shard_imputers(
+    imputers: list[DataFrameImputer], n_shards: int
+) -> list[DataFrameImputer]:
+    return [shard for imputer in imputers for shard in _shard_imputer(imputer, n_shards)]
+
+
+def _copy_fitted_state(imputer: DataFrameImputer, shards: list[DataFrameImputer]):
+    # Fitted attributes end in an underscore and internal state starts with
+    # one; parameters, like a shared cache, stay the caller's own. Fitted
+    # Series of column shards cover their own columns and are concatenated.
+    for name, value in vars(shards[0]).items():
+        if not (name.endswith("_") or name.startswith("_")):
+            continue
+        values = [vars(shard)[name] for shard in shards]
+        if len(shards) > 1 and all(isinstance(v, pd.Series) for v in values):
+            value = pd.concat(values)
+        setattr(imputer, name, value)
+
+
+def _conflicts(first: DataFrameImputer, second: DataFrameImputer) -> bool:
+    first_reads, first_writes = first.read_features, first.write_features
+    second_reads, second_writes = second.read_features, second.write_features
+    if None in (first_reads, first_writes, second_reads, second_writes):
+        return True
+    return (
+        not set(first_writes).isdisjoint(second_reads)
+        or not set(first_writes).isdisjoint(second_writes)
+        or not set(first_reads).isdisjoint(second_writes)
+    )
+
+
+def build_dependency_levels(imputers: list[DataFrameImputer]) -> list[list[int]]:
+    # Imputers on the same level touch disjoint columns and can run concurrently
+    levels = []
+    for j, imputer in enumerate(imputers):
+        level = 0
+        for i in range(j):
+            if levels[i] >= level and _conflicts(imputers[i], imputer):
+                level = levels[i] + 1
+        levels.append(level)
+    grouped = [[] for _ in range(max(levels, default=-1) + 1)]
+    for index, level in enumerate(levels):
+        grouped[level].append(index)
+    return grouped
+
+
+def _run_imputer(
+    imputer: DataFrameImputer, df: pd.DataFrame
+) -> tuple[DataFrameImputer, pd.DataFrame]:
+    # The fitted imputer comes back too, since a process only fits a copy
+    return imputer, imputer.impute(df)[imputer.write_features]
+
+
+def _get_executor(backend: Literal["threads", "processes"], n_jobs: int) -> Executor:
+    if backend == "threads":
+        return ThreadPoolExecutor(max_workers=n_jobs)
+    if backend == "processes":
+        return ProcessPoolExecutor(max_workers=n_jobs)
+    raise ValueError(f"Invalid backend: {backend}")
+
+
+def impute_missing_values_parallel(
+    df: pd.DataFrame,
+    imputers: list[DataFrameImputer],
+    n_jobs: int = 2,
+    backend: Literal["threads", "processes"] = "threads",
+) -> pd.DataFrame:
+    # The caller's imputers end up fitted like after a sequential run
+    shards = [_shard_imputer(imputer, n_jobs) for imputer in imputers]
+    imputers_ = [shard for imputer_shards in shards for shard in imputer_shards]
+    with _get_executor(backend, n_jobs) as executor:
+        for level in build_dependency_levels(imputers_):
+            imputer = imputers_[level[0]]
+            if imputer.read_features is None or imputer.write_features is None:
+                # Imputers with unknown columns always sit alone on their level
+                df = imputer.impute(df)
+                continue
+            # Each task only receives the columns it reads, never the whole frame
+            futures = [
+                executor.submit(
+                    _run_imputer,
+                    imputers_[i],
+                    df[imputers_[i].read_features].copy(),
+                )
+                for i in level
+            ]
+            # Results are written back in submission order, so the output does
+            # not depend on which task finishes first
+            for i, future in zip(level, futures):
+                imputers_[i], result = future.result()
+                df[list(result.columns)] = result
+    start = 0
+    for imputer, imputer_shards in zip(imputers, shards):
+        _copy_fitted_state(imputer, imputers_[start : start + len(imputer_shards)])
+        start += len(imputer_shards)
+    return df
@@ -0,0 +1,214 @@
+import argparse
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from columnar_io import read_frame, read_schema, write_frame
+from downcast import DowncastReport, downcast_dtypes
+from process_data import (
+    ConstantImputer,
+    DataFrameImputer,
+    GroupStatisticImputer,
+    MissingIndex,
+    StatisticsImputer,
+    impute_missing_values,
+)
+from utils import check_variables_is_list
+
+IMPUTER_TYPES = {
+    "group_statistic": GroupStatisticImputer,
+    "constant": ConstantImputer,
+    "statistics": StatisticsImputer,
+}
+# Parameters that may be a column selector such as {"dtypes": ["number"]}
+# instead of a list of column names
+SELECTOR_PARAMETERS = ("features", "target_feature")
+STRATEGIES = ("most_frequent", "median", "mean")
+
+
+def load_config(path: str) -> dict:
+    suffix = Path(path).suffix.lower()
+    with open(path, "rb") as f:
+        if suffix in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError as error:
+                raise ImportError(
+                    "YAML configs need pyyaml, "
+                    "install it with: pip install 'refactor-function[config]'"
+                ) from error
+            config = yaml.safe_load(f)
+        elif suffix == ".toml":
+            import tomllib
+
+            config = tomllib.load(f)
+        elif suffix == ".json":
+            config = json.load(f)
+        else:
+            raise ValueError(f"Unsupported config format: {suffix}")
+    if not isinstance(config, dict) or not isinstance(config.get("imputers"), list):
+        raise ValueError("The config must have a list of imputers")
+    return config
+
+
+@dataclass
+class CompiledPipeline:
+    # Imputer parameters with every column selector resolved against a schema,
+    # so building the imputers needs no further introspection
+    steps: list[dict]
+    columns: list[str]
+
+    def build_imputers(self) -> list[DataFrameImputer]:
+        return [
+            IMPUTER_TYPES[step["type"]](**step["params"]) for step in self.steps
+        ]
+
+
+def get_schema_key(config: dict, schema: pd.DataFrame) -> str:
+    signature = {
+        "config": config,
+        "schema": [[str(column), str(dtype)] for column, dtype in schema.dtypes.items()],
+    }
+    encoded = json.dumps(signature, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _resolve_columns(selector, schema: pd.DataFrame):
+    if isinstance(selector, dict):
+        unknown = set(selector) - {"dtypes", "exclude"}
+        if unknown or "dtypes" not in selector:
+            raise ValueError(f"Invalid column selector: {selector}")
+        columns = schema.select_dtypes(include=selector["dtypes"]).columns
+        return [column for column in columns if column not in selector.get("exclude", [])]
+    return selector
+
+
+def _validate_step(step: dict, schema: pd.DataFrame):
+    params = step["params"]
+    columns = []
+    for name in ("features", "group_feature", "target_feature", "fallback"):
+        for value in check_variables_is_list(params.get(name, [])):
+            columns += check_variables_is_list(value)
+    missing = [column for column in columns if column not in schema.columns]
+    if missing:
+        raise ValueError(f"Columns not in the input: {missing}")
+    strategy = params.get("strategy")
+    if step["type"] != "constant" and strategy not in STRATEGIES:
+        raise ValueError(f"Invalid strategy: {strategy}")
+    if strategy in ("mean", "median"):
+        targets = params.get("features", params.get("target_feature"))
+        for target in check_variables_is_list(targets):
+            if not is_numeric_dtype(schema[target].dtype):
+                raise ValueError(f"Cannot compute the {strategy} of {target}")
+
+
+def compile_pipeline(config: dict, schema: pd.DataFrame) -> CompiledPipeline:
+    steps = []
+    for position, imputer_config in enumerate(config["imputers"]):
+        params = dict(imputer_config)
+        type_ = params.pop("type", None)
+        if type_ not in IMPUTER_TYPES:
+            raise ValueError(f"Imputer {position} has an invalid type: {type_}")
+        for name in SELECTOR_PARAMETERS:
+            if name in params:
+                params[name] = _resolve_columns(params[name], schema)
+        step = {"type": type_, "params": params}
+        try:
+            IMPUTER_TYPES[type_](**params)
+        except TypeError as e:
+            raise ValueError(f"Imputer {position} has invalid parameters: {e}") from e
+        _validate_step(step, schema)
+        steps.append(step)
+    compiled = CompiledPipeline(steps, [])
+    required = set()
+    for imputer in compiled.build_imputers():
+        required.update(imputer.read_features)
+    compiled.columns = [column for column in schema.columns if column in required]
+    return compiled
+
+
+def load_compiled_pipeline(
+    config: dict, schema: pd.DataFrame, cache_dir: Optional[str] = None
+) -> CompiledPipeline:
+    # Plans are cached on disk by config and schema, so repeated runs over
+    # files with the same schema skip resolving and validating the columns
+    if cache_dir is None:
+        return compile_pipeline(config, schema)
+    path = Path(cache_dir) / f"{get_schema_key(config, schema)}.json"
+    if path.exists():
+        with open(path) as f:
+            return CompiledPipeline(**json.load(f))
+    compiled = compile_pipeline(config, schema)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(asdict(compiled), f, default=str)
+    return compiled
+
+
+def run_pipeline(
+    config_path: str,
+    input_path: str,
+    output_path: str,
+    cache_dir: Optional[str] = None,
+    pass_through: Optional[list[str]] = None,
+    memory_map: bool = False,
+    downcast_report: Optional[DowncastReport] = None,
+) -> MissingIndex:
+    # Selectors are resolved on the file's schema, before any downcast
+    schema = read_schema(input_path)
+    compiled = load_compiled_pipeline(load_config(config_path), schema, cache_dir)
+    required = set(compiled.columns) | set(pass_through or [])
+    columns = [column for column in schema.columns if column in required]
+    df = read_frame(input_path, columns, memory_map=memory_map)
+    imputers = compiled.build_imputers()
+    if downcast_report is not None:
+        df = downcast_dtypes(df, imputers, report=downcast_report)
+    missing_index = MissingIndex(df)
+    df = impute_missing_values(df, imputers, missing_index=missing_index)
+    write_frame(df, output_path)
+    return missing_index
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Run imputation pipelines from configs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Impute a file")
+    run_parser.add_argument("config")
+    run_parser.add_argument("input")
+    run_parser.add_argument("output")
+    run_parser.add_argument("--cache-dir", default=".impute_cache")
+    run_parser.add_argument("--no-cache", action="store_true")
+    run_parser.add_argument("--pass-through", nargs="+", default=[])
+    run_parser.add_argument("--memory-map", action="store_true")
+    run_parser.add_argument("--downcast", action="store_true")
+    compile_parser = subparsers.add_parser(
+        "compile", help="Validate a config against a file and print the plan"
+    )
+    compile_parser.add_argument("config")
+    compile_parser.add_argument("input")
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        compiled = compile_pipeline(load_config(args.config), read_schema(args.input))
+        print(json.dumps(asdict(compiled), indent=2, default=str))
+        return
+    downcast_report = DowncastReport() if args.downcast else None
+    missing_index = run_pipeline(
+        args.config,
+        args.input,
+        args.output,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        pass_through=args.pass_through,
+        memory_map=args.memory_map,
+        downcast_report=downcast_report,
+    )
+    if downcast_report is not None:
+        print(downcast_report)
+    print(f"There are {missing_index.null_count} null values after imputing")
+
+
+if __name__ == "__main__":
+    main()
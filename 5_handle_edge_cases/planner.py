@@ -0,0 +1,169 @@
+import copy
+from dataclasses import dataclass
+from typing import Optional, Union
+import pandas as pd
+from pandas.api.types import is_number
+from process_data import (
+    DataFrameImputer,
+    ConstantImputer,
+    MissingIndex,
+    StatisticsImputer,
+    _get_float_features,
+    fill_missing,
+    fill_missing_block,
+    impute_missing_values,
+)
+from utils import check_variables_is_list
+
+
+class FusedConstantImputer(DataFrameImputer):
+    supports_missing_index = True
+
+    def __init__(self, fill_values: dict):
+        self.fill_values = fill_values
+
+    def impute(
+        self,
+        df: pd.DataFrame,
+        inplace: bool = True,
+        missing_index: Optional[MissingIndex] = None,
+    ) -> pd.DataFrame:
+        # float64 columns are filled as one block per fill value instead of
+        # one pass per imputer, other columns one by one like ConstantImputer
+        if not inplace:
+            df = df.copy()
+        blocks = {}
+        for feature, fill_value in self.fill_values.items():
+            if (
+                is_number(fill_value)
+                and not isinstance(fill_value, bool)
+                and not pd.isna(fill_value)
+            ):
+                if _get_float_features(df, [feature]):
+                    blocks.setdefault(fill_value, []).append(feature)
+                    continue
+            fill_missing(df, feature, fill_value, missing_index)
+        for fill_value, features in blocks.items():
+            fill_missing_block(df, features, fill_value, missing_index)
+        return df
+
+    @property
+    def read_features(self) -> list:
+        return list(self.fill_values)
+
+    @property
+    def write_features(self) -> list:
+        return list(self.fill_values)
+
+
+@dataclass
+class ExecutionPlan:
+    steps: list[DataFrameImputer]
+    sequential_column_passes: int
+    fused_column_passes: int
+
+    @property
+    def column_passes_saved(self) -> int:
+        return self.sequential_column_passes - self.fused_column_passes
+
+
+def _merge_constant_imputers(imputers: list[ConstantImputer]) -> FusedConstantImputer:
+    fill_values = {}
+    for imputer in imputers:
+        for feature in imputer.features:
+            # An earlier non-null fill leaves nothing for later imputers to fill
+            if feature not in fill_values or pd.isna(fill_values[feature]):
+                fill_values[feature] = imputer.fill_value
+    return FusedConstantImputer(fill_values)
+
+
+def _with_features(imputer: DataFrameImputer, features: list) -> DataFrameImputer:
+    # Same constructor parameters, cache included, over other columns
+    imputer = copy.copy(imputer)
+    imputer.features = features
+    return imputer
+
+
+def _is_sampled(imputer: DataFrameImputer) -> bool:
+    # Samples are seeded by column position, so sampled imputers keep their
+    # columns as they are instead of being pruned, merged or split
+    return getattr(imputer, "sample_size", None) is not None
+
+
+def _can_merge_statistics(
+    run: list[StatisticsImputer], imputer: StatisticsImputer
+) -> bool:
+    if _is_sampled(run[0]) or _is_sampled(imputer):
+        return False
+    if (run[0].strategy, run[0].backend) != (imputer.strategy, imputer.backend):
+        return False
+    if run[0].cache is not imputer.cache:
+        return False
+    merged_features = {feature for step in run for feature in step.features}
+    return merged_features.isdisjoint(imputer.features)
+
+
+def _drop_filled_features(imputer: DataFrameImputer, filled: set) -> DataFrameImputer:
+    features = [feature for feature in imputer.features if feature not in filled]
+    if len(features) == len(imputer.features) or _is_sampled(imputer):
+        return imputer
+    return _with_features(imputer, features)
+
+
+def _count_column_passes(imputers: list[DataFrameImputer]) -> int:
+    return sum(len(imputer.write_features or []) for imputer in imputers)
+
+
+def plan_imputers(
+    imputers: Union[DataFrameImputer, list[DataFrameImputer]],
+) -> ExecutionPlan:
+    imputers_ = check_variables_is_list(imputers)
+
+    # Drop columns that an earlier constant fill already left without NaNs
+    pruned = []
+    filled = set()
+    for imputer in imputers_:
+        if type(imputer) in (ConstantImputer, StatisticsImputer):
+            imputer = _drop_filled_features(imputer, filled)
+            if not imputer.features:
+                continue
+        pruned.append(imputer)
+        if imputer.write_features is None:
+            filled.clear()
+        elif type(imputer) is ConstantImputer and not pd.isna(imputer.fill_value):
+            filled.update(imputer.features)
+
+    # Merge consecutive runs of constant and statistics imputers
+    steps = []
+    run = []
+    for imputer in pruned + [None]:
+        if run and type(imputer) is type(run[0]):
+            if type(imputer) is ConstantImputer or _can_merge_statistics(
+                run, imputer
+            ):
+                run.append(imputer)
+                continue
+        if len(run) > 1 and type(run[0]) is ConstantImputer:
+            steps.append(_merge_constant_imputers(run))
+        elif len(run) > 1:
+            features = [feature for step in run for feature in step.features]
+            steps.append(_with_features(run[0], features))
+        else:
+            steps.extend(run)
+        run = []
+        if type(imputer) in (ConstantImputer, StatisticsImputer):
+            run = [imputer]
+        elif imputer is not None:
+            steps.append(imputer)
+
+    return ExecutionPlan(
+        steps=steps,
+        sequential_column_passes=_count_column_passes(imputers_),
+        fused_column_passes=_count_column_passes(steps),
+    )
+
+
+def impute_missing_values_fused(
+    df: pd.DataFrame, imputers: Union[DataFrameImputer, list[DataFrameImputer]]
+) -> pd.DataFrame:
+    return impute_missing_values(df, plan_imputers(imputers).steps)
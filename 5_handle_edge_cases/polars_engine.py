@@ -0,0 +1,219 @@
+from typing import Optional, Union
+import pandas as pd
+import polars as pl
+from pandas.api.types import is_integer_dtype
+from process_data import (
+    ConstantImputer,
+    DataFrameImputer,
+    GroupStatisticImputer,
+    StatisticsImputer,
+    impute_missing_values,
+)
+from utils import check_variables_is_list
+
+
+def _get_statistic_expression(feature: str, strategy: str) -> pl.Expr:
+    column = pl.col(feature)
+    if strategy == "mean":
+        return column.mean()
+    if strategy == "median":
+        return column.median()
+    if strategy == "most_frequent":
+        # Ties go to the smallest value, like get_mode
+        return column.drop_nulls().mode().sort().first()
+    raise ValueError(f"Invalid strategy: {strategy}")
+
+
+def _get_group_fill_expression(
+    imputer: GroupStatisticImputer, target: str
+) -> pl.Expr:
+    # One window aggregation per level, the first non-null one wins
+    levels = []
+    for group_features in [imputer.group_features] + imputer.fallback:
+        statistic = _get_statistic_expression(target, imputer.strategy)
+        if imputer.min_group_size > 1:
+            statistic = pl.when(
+                pl.col(target).count() >= imputer.min_group_size
+            ).then(statistic)
+        levels.append(statistic.over(group_features) if group_features else statistic)
+    return levels[0] if len(levels) == 1 else pl.coalesce(levels)
+
+
+def _get_kind(dtype: pl.DataType) -> str:
+    if dtype.is_numeric():
+        return "numeric"
+    if dtype == pl.String or dtype == pl.Categorical or isinstance(dtype, pl.Enum):
+        return "string"
+    return str(dtype.base_type())
+
+
+def get_fill_literal(fill_value, dtype: pl.DataType) -> Optional[pl.Expr]:
+    # The fill value as a literal of the column's dtype, or None if it does
+    # not fit. fill_null would otherwise cast the column to a supertype, e.g.
+    # a float column to strings, where pandas writes mixed objects.
+    if fill_value is None:
+        return pl.lit(None, dtype=dtype)
+    try:
+        literal = pl.Series([fill_value])
+        cast = literal.cast(dtype, strict=True)
+    except (pl.exceptions.PolarsError, TypeError, OverflowError):
+        return None
+    if _get_kind(literal.dtype) != _get_kind(dtype):
+        return None
+    # Lossy casts, like 1.5 to an integer column, do not fit either
+    if not cast.cast(literal.dtype).equals(literal):
+        return None
+    return pl.lit(cast[0], dtype=dtype)
+
+
+def _get_unsupported_reason(imputer: DataFrameImputer) -> Optional[str]:
+    # Why polars cannot run the imputer like pandas, None if it can. Only the
+    # exact built-in types translate, since subclasses may compute otherwise,
+    # and sampling, the cache and the numpy backend only exist in pandas.
+    if type(imputer) not in (ConstantImputer, StatisticsImputer, GroupStatisticImputer):
+        return f"{type(imputer).__name__} has no polars expressions"
+    if getattr(imputer, "sample_size", None) is not None:
+        return "Sampled statistics have no polars expressions"
+    if getattr(imputer, "cache", None) is not None:
+        return "The statistics cache is only used by the pandas engine"
+    if getattr(imputer, "backend", "pandas") != "pandas":
+        return "The numpy backend is only used by the pandas engine"
+    return None
+
+
+def can_run_in_polars(imputer: DataFrameImputer, schema: pl.Schema) -> bool:
+    if _get_unsupported_reason(imputer) is not None:
+        return False
+    if type(imputer) is not ConstantImputer:
+        return True
+    return all(
+        get_fill_literal(imputer.fill_value, schema[feature]) is not None
+        for feature in imputer.features
+    )
+
+
+def to_expressions(
+    imputer: DataFrameImputer, schema: Optional[pl.Schema] = None
+) -> list[pl.Expr]:
+    # The imputer as polars expressions that replace the columns it writes.
+    # Constant fills need the schema of the frame they fill.
+    reason = _get_unsupported_reason(imputer)
+    if reason is not None:
+        raise ValueError(reason)
+    if type(imputer) is ConstantImputer:
+        if schema is None:
+            raise ValueError("Constant fills need the schema of the frame")
+        expressions = []
+        for feature in imputer.features:
+            literal = get_fill_literal(imputer.fill_value, schema[feature])
+            if literal is None:
+                raise ValueError(
+                    f"Fill value {imputer.fill_value!r} does not fit column "
+                    f"{feature} of type {schema[feature]}, use the pandas engine"
+                )
+            expressions.append(pl.col(feature).fill_null(literal))
+        return expressions
+    if type(imputer) is StatisticsImputer:
+        return [
+            pl.col(feature).fill_null(
+                _get_statistic_expression(feature, imputer.strategy)
+            )
+            for feature in imputer.features
+        ]
+    if type(imputer) is GroupStatisticImputer:
+        return [
+            pl.col(target).fill_null(_get_group_fill_expression(imputer, target))
+            for target in imputer.target_features
+        ]
+
+
+def _check_group_features(
+    lf: pl.LazyFrame, imputers: list[DataFrameImputer]
+) -> None:
+    # Group features must be non-null where they are read, like in pandas.
+    # Only columns that no earlier imputer writes are checked, on the input.
+    group_features = []
+    written = set()
+    for imputer in imputers:
+        if type(imputer) is GroupStatisticImputer:
+            group_features += [
+                feature
+                for feature in imputer.all_group_features
+                if feature not in written and feature not in group_features
+            ]
+        written.update(imputer.write_features)
+    if not group_features:
+        return
+    null_counts = lf.select(pl.col(group_features).null_count()).collect().row(0)
+    for feature, null_count in zip(group_features, null_counts):
+        if null_count:
+            raise ValueError(f"Group feature {feature} cannot contain NaN values")
+
+
+def _build_query(
+    lf: pl.LazyFrame, imputers: list[DataFrameImputer]
+) -> tuple[pl.LazyFrame, int]:
+    # The query of the longest prefix of imputers that polars runs like
+    # pandas, and the length of that prefix. Only the schema is resolved.
+    for i, imputer in enumerate(imputers):
+        schema = lf.collect_schema()
+        if not can_run_in_polars(imputer, schema):
+            return lf, i
+        lf = lf.with_columns(to_expressions(imputer, schema))
+    return lf, len(imputers)
+
+
+def impute_lazy(
+    lf: pl.LazyFrame,
+    imputers: Union[DataFrameImputer, list[DataFrameImputer]],
+    check_group_features: bool = False,
+) -> pl.LazyFrame:
+    # Every imputer becomes one with_columns step, so later imputers see the
+    # filled columns and the whole chain is a single lazy query. Null group
+    # features form their own group here; check_group_features raises on
+    # them like pandas, at the cost of one more scan of the input.
+    imputers_ = check_variables_is_list(imputers)
+    if check_group_features:
+        _check_group_features(lf, imputers_)
+    for imputer in imputers_:
+        lf = lf.with_columns(to_expressions(imputer, lf.collect_schema()))
+    return lf
+
+
+def _restore_categories(
+    column: pd.Series, dtype: pd.CategoricalDtype
+) -> pd.Series:
+    # polars orders categories by first appearance; pandas keeps the column's
+    # categories and appends new fill values after them
+    categories = list(dtype.categories)
+    known = set(categories)
+    categories += [value for value in column.cat.categories if value not in known]
+    return column.cat.set_categories(categories, ordered=dtype.ordered)
+
+
+def impute_missing_values_polars(
+    df: pd.DataFrame,
+    imputers: Union[DataFrameImputer, list[DataFrameImputer]],
+    streaming: bool = False,
+) -> pd.DataFrame:
+    # From the first imputer that polars cannot run like pandas, e.g. a
+    # constant that does not fit its column or a sampled statistic, the
+    # remaining imputers run in pandas
+    imputers_ = check_variables_is_list(imputers)
+    lf = pl.from_pandas(df).lazy()
+    _check_group_features(lf, imputers_)
+    lf, n_steps = _build_query(lf, imputers_)
+    result = lf.collect(engine="streaming" if streaming else "auto").to_pandas()
+    result.index = df.index
+    # The caller's version, which keys the statistics cache, is kept
+    result.attrs = dict(df.attrs)
+    # pandas integer columns cannot hold NaN, so polars' float upcast from a
+    # mean or median fill is undone
+    for feature, dtype in df.dtypes.items():
+        if is_integer_dtype(dtype) and result[feature].dtype != dtype:
+            result[feature] = result[feature].astype(dtype)
+        elif isinstance(dtype, pd.CategoricalDtype):
+            result[feature] = _restore_categories(result[feature], dtype)
+    if n_steps < len(imputers_):
+        result = impute_missing_values(result, imputers_[n_steps:])
+    return result
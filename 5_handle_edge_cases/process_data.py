@@ -1,9 +1,31 @@
+import copy
+import os
+import pickle
+import threading
+import warnings
+import numpy as np
 import pandas as pd
 from abc import abstractmethod, ABC
-from typing import Union, Iterable, TypeVar, Literal
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Union, Iterable, TypeVar, Literal
+from pandas.api.extensions import ExtensionArray
+from pandas.api.types import (
+    infer_dtype,
+    is_bool_dtype,
+    is_float_dtype,
+    is_number,
+    is_numeric_dtype,
+)
+from approximate import (
+    get_confidence_bounds,
+    sample_positions,
+    stratified_sample,
+)
 from utils import check_variables_is_list
 
 NumberOrStr = TypeVar("NumberOrStr", int, float, str)
+Strategy = Literal["most_frequent", "median", "mean"]
+Backend = Literal["pandas", "numpy"]
 
 
 def get_strategy_function(strategy: Literal["most_frequent", "median", "mean"]):
@@ -20,78 +42,1347 @@ def get_strategy_function(strategy: Literal["most_frequent", "median", "mean"]):
     return strategy_functions[strategy]
 
 
+# Largest number of (group, value) pairs counted with a dense bincount table
+DENSE_MODE_LIMIT = 10_000_000
+
+
+def _factorize_sorted(values) -> tuple[np.ndarray, Union[np.ndarray, pd.Index]]:
+    # Sorted codes make the smallest code the smallest value. Values that
+    # cannot be ordered keep their order of first appearance instead.
+    try:
+        return pd.factorize(values, sort=True)
+    except TypeError:
+        return pd.factorize(values)
+
+
+def get_mode(series: pd.Series):
+    # Most frequent value. Ties go to the smallest value, like Series.mode,
+    # and an all-NaN series has no mode (pd.NA). Floats are counted over
+    # integer codes, other dtypes with value_counts, whichever hashes faster.
+    if series.dtype.kind == "f":
+        codes, uniques = pd.factorize(series)
+        counts = np.bincount(codes[codes >= 0])
+    else:
+        value_counts = series.value_counts(sort=False)
+        counts, uniques = value_counts.to_numpy(), value_counts.index
+    # Unobserved categories are counted as 0
+    if len(counts) == 0 or counts.max() == 0:
+        return pd.NA
+    tied = uniques.take(np.flatnonzero(counts == counts.max()))
+    # Categories sort in their category order, like Series.mode
+    try:
+        return tied.sort_values()[0]
+    except TypeError:
+        return tied[0]
+
+
+def _argsort_codes(codes: np.ndarray) -> np.ndarray:
+    # Stable argsort of non-negative integer codes in 16-bit digits, least
+    # significant first. numpy radix sorts 16-bit integers in linear time.
+    order = np.arange(len(codes))
+    top = codes.max(initial=0)
+    shift = 0
+    while True:
+        digits = ((codes[order] >> shift) & 0xFFFF).astype(np.uint16)
+        order = order[np.argsort(digits, kind="stable")]
+        shift += 16
+        if top >> shift == 0:
+            return order
+
+
+class GroupIndex:
+    # Group keys factorized once into integer codes, so every statistic and
+    # every target that shares the grouping reuses them instead of regrouping.
+    # Without group features all rows fall into one global group.
+    def __init__(self, df: pd.DataFrame, group_features: Union[str, list[str]]):
+        self.group_features = check_variables_is_list(group_features)
+        if not self.group_features:
+            self.codes, groups = np.zeros(len(df), dtype=np.intp), [0]
+        else:
+            self.codes, groups = _factorize_sorted(
+                _get_group_keys(df, self.group_features)
+            )
+        if len(self.group_features) <= 1:
+            self.groups = pd.Index(groups, name=next(iter(self.group_features), None))
+        else:
+            self.groups = pd.MultiIndex.from_tuples(groups, names=self.group_features)
+        self.sizes = np.bincount(self.codes[self.codes >= 0], minlength=self.n_groups)
+        self._sorted_positions = None
+
+    @property
+    def n_groups(self) -> int:
+        return len(self.groups)
+
+    def sorted_positions(self) -> np.ndarray:
+        # Positions of the rows that have a group, ordered by group and then
+        # by row, so every group is one contiguous block. Computed once.
+        if self._sorted_positions is None:
+            positions = np.flatnonzero(self.codes >= 0)
+            self._sorted_positions = positions[_argsort_codes(self.codes[positions])]
+        return self._sorted_positions
+
+    def take(self, positions: np.ndarray) -> "GroupIndex":
+        # Index of a subset of the rows with the same groups
+        group_index = copy.copy(self)
+        group_index.codes = self.codes[positions]
+        group_index._sorted_positions = None
+        group_index.sizes = np.bincount(
+            group_index.codes[group_index.codes >= 0], minlength=self.n_groups
+        )
+        return group_index
+
+    def observed_counts(self, values: pd.Series) -> np.ndarray:
+        # Non-missing values per group
+        observed = (self.codes >= 0) & values.notna().to_numpy()
+        return np.bincount(self.codes[observed], minlength=self.n_groups)
+
+
+def _get_group_keys(
+    df: pd.DataFrame, group_features: list[str]
+) -> Union[pd.Series, pd.MultiIndex]:
+    if len(group_features) == 1:
+        return df[group_features[0]]
+    return pd.MultiIndex.from_frame(df[group_features])
+
+
+def get_group_codes(
+    df: pd.DataFrame,
+    group_features: list[str],
+    groups: pd.Index,
+    group_index: Optional[GroupIndex] = None,
+) -> np.ndarray:
+    # Position of each row's group in groups, -1 for groups not in it
+    if group_index is not None and (
+        groups is group_index.groups or groups.equals(group_index.groups)
+    ):
+        return group_index.codes
+    if not group_features:
+        return np.zeros(len(df), dtype=np.intp)
+    return groups.get_indexer(_get_group_keys(df, group_features))
+
+
+def _group_means(group_index: GroupIndex, values: pd.Series) -> np.ndarray:
+    # Same arithmetic as Series.mean per group, so the means are identical to
+    # the lambda path: the group's values with NaNs zeroed, in row order,
+    # summed by numpy in the column's own float dtype (float64 for integers).
+    # Groups of the same size are laid out as the rows of one matrix, whose
+    # row sums numpy computes exactly like the sum of each group alone, so
+    # there is one sum per distinct group size rather than per group. Other
+    # dtypes use pandas' groupby mean.
+    dtype = values.dtype
+    if not isinstance(dtype, np.dtype) or dtype.kind not in "iuf":
+        observed = group_index.codes >= 0
+        means = (
+            pd.Series(values.to_numpy()[observed])
+            .groupby(group_index.codes[observed])
+            .mean()
+        )
+        return means.reindex(range(group_index.n_groups)).to_numpy()
+    sum_dtype = dtype if dtype.kind == "f" else np.dtype(np.float64)
+    positions = group_index.sorted_positions()
+    codes, values = group_index.codes[positions], values.to_numpy()[positions]
+    if dtype.kind == "f":
+        missing = np.isnan(values)
+        values = np.where(missing, 0, values)
+        counts = np.bincount(codes[~missing], minlength=group_index.n_groups)
+    else:
+        counts = group_index.sizes
+    sizes = group_index.sizes
+    starts = np.cumsum(sizes) - sizes
+    sums = np.zeros(group_index.n_groups, dtype=sum_dtype)
+    by_size = np.argsort(sizes, kind="stable")
+    bounds = np.flatnonzero(np.diff(sizes[by_size])) + 1
+    for groups in np.split(by_size, bounds):
+        size = sizes[groups[0]] if len(groups) else 0
+        if size:
+            rows = values[starts[groups, None] + np.arange(size)]
+            sums[groups] = rows.sum(axis=1, dtype=sum_dtype)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts.astype(sum_dtype)
+    return np.where(counts > 0, means, np.nan).astype(sum_dtype)
+
+
+def _group_medians(
+    group_index: GroupIndex, values: pd.Series
+) -> Union[np.ndarray, ExtensionArray]:
+    dtype = values.dtype
+    if dtype.kind in "mM":
+        # Datetimes and timedeltas as int64 ticks with NaT as NaN, and the
+        # medians truncated back to ticks of the same dtype, like Series.median
+        ticks = values.array.asi8.astype(float)
+        ticks[values.isna().to_numpy()] = np.nan
+        medians = _group_medians(group_index, pd.Series(ticks))
+        # NaT is the smallest int64, which float64 holds exactly
+        medians = np.where(np.isnan(medians), np.iinfo(np.int64).min, medians)
+        medians = pd.array(medians.astype(np.int64).view(dtype.base))
+        if getattr(dtype, "tz", None) is not None:
+            medians = medians.tz_localize("UTC").tz_convert(dtype.tz)
+        return medians
+    values = values.to_numpy(dtype=float)
+    observed = (group_index.codes >= 0) & ~np.isnan(values)
+    codes, values = group_index.codes[observed], values[observed]
+    # Sorting by (group, value) lays every group out as one contiguous block
+    values = values[np.lexsort((values, codes))]
+    counts = np.bincount(codes, minlength=group_index.n_groups)
+    starts = np.cumsum(counts) - counts
+    has_values = counts > 0
+    lower = values[starts[has_values] + (counts[has_values] - 1) // 2]
+    upper = values[starts[has_values] + counts[has_values] // 2]
+    medians = np.full(group_index.n_groups, np.nan)
+    medians[has_values] = (lower + upper) / 2
+    return medians
+
+
+def get_group_modes(
+    df: pd.DataFrame,
+    group_feature: Union[str, list[str]],
+    target_feature: str,
+    group_index: Optional[GroupIndex] = None,
+) -> pd.Series:
+    if group_index is None:
+        group_index = GroupIndex(df, group_feature)
+    group_codes, groups = group_index.codes, group_index.groups
+    value_codes, values = _factorize_sorted(df[target_feature])
+    observed = (value_codes >= 0) & (group_codes >= 0)
+    group_codes, value_codes = group_codes[observed], value_codes[observed]
+    n_groups, n_values = len(groups), len(values)
+    if n_values == 0:
+        mode_groups = mode_codes = np.array([], dtype=np.intp)
+    elif n_groups * n_values <= DENSE_MODE_LIMIT:
+        counts = np.bincount(
+            group_codes * n_values + value_codes, minlength=n_groups * n_values
+        ).reshape(n_groups, n_values)
+        has_mode = counts.any(axis=1)
+        mode_codes = counts.argmax(axis=1)[has_mode]
+        mode_groups = np.flatnonzero(has_mode)
+    else:
+        # Too many pairs for a dense table: count the distinct pairs only
+        keys, counts = np.unique(
+            group_codes.astype(np.int64) * n_values + value_codes, return_counts=True
+        )
+        key_groups = keys // n_values
+        # Keys are sorted by (group, value), so the first maximum of each group
+        # is its smallest most frequent value
+        order = np.argsort(-counts, kind="stable")
+        order = order[np.argsort(key_groups[order], kind="stable")]
+        first = np.r_[True, key_groups[order][1:] != key_groups[order][:-1]]
+        mode_groups = key_groups[order][first]
+        mode_codes = keys[order][first] % n_values
+    modes = pd.Series(values.take(mode_codes), index=groups.take(mode_groups))
+    if df[target_feature].dtype == object:
+        # Series.mode of an all-NaN group is empty, so the lambda fills pd.NA
+        modes = modes.reindex(groups, fill_value=pd.NA)
+    return modes
+
+
+def get_group_value_counts(
+    df: pd.DataFrame,
+    group_feature: Union[str, list[str]],
+    target_feature: str,
+    group_index: Optional[GroupIndex] = None,
+) -> pd.Series:
+    # Count of every non-missing (group, value) pair, sorted by group and
+    # value. Without group features the index holds the values alone.
+    if group_index is None:
+        group_index = GroupIndex(df, group_feature)
+    value_codes, values = _factorize_sorted(df[target_feature])
+    observed = (value_codes >= 0) & (group_index.codes >= 0)
+    n_values = max(len(values), 1)
+    keys, counts = np.unique(
+        group_index.codes[observed].astype(np.int64) * n_values + value_codes[observed],
+        return_counts=True,
+    )
+    values = values.take(keys % n_values)
+    if not group_index.group_features:
+        return pd.Series(counts, index=pd.Index(values, name=target_feature))
+    groups = group_index.groups.take(keys // n_values)
+    index = pd.MultiIndex.from_arrays(
+        [groups.get_level_values(level) for level in range(groups.nlevels)] + [values],
+        names=group_index.group_features + [target_feature],
+    )
+    return pd.Series(counts, index=index)
+
+
+def sample_from_counts(
+    counts: np.ndarray,
+    group_starts: np.ndarray,
+    codes: np.ndarray,
+    weighted: bool,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    # Position of one drawn value per code, all in one call. The values of
+    # group g are counts[group_starts[g] : group_starts[g + 1]], and code -1
+    # draws -1. Weighted draws pick a uniform ticket below the group's total
+    # count and take the value whose cumulative count covers it, which is a
+    # uniform draw from the group's rows without listing them.
+    drawn = np.full(len(codes), -1, dtype=np.intp)
+    valid = codes >= 0
+    codes = codes[valid]
+    if weighted:
+        cumulative = np.concatenate([[0], np.cumsum(counts)])
+        tickets = rng.integers(
+            cumulative[group_starts[codes]], cumulative[group_starts[codes + 1]]
+        )
+        drawn[valid] = np.searchsorted(cumulative, tickets, side="right") - 1
+    else:
+        drawn[valid] = rng.integers(group_starts[codes], group_starts[codes + 1])
+    return drawn
+
+
+def get_statistic(series: pd.Series, strategy: Strategy):
+    statistic_functions = {
+        "most_frequent": get_mode,
+        "median": lambda series: series.median(),
+        "mean": lambda series: series.mean(),
+    }
+    if strategy not in statistic_functions:
+        raise ValueError(f"Invalid strategy: {strategy}")
+
+    return statistic_functions[strategy](series)
+
+
+def get_group_statistics(
+    df: pd.DataFrame,
+    group_feature: Union[str, list[str]],
+    target_feature: str,
+    strategy: Strategy,
+    group_index: Optional[GroupIndex] = None,
+) -> pd.Series:
+    # One fill value per group, computed over the factorized group codes
+    if strategy not in ("most_frequent", "median", "mean"):
+        raise ValueError(f"Invalid strategy: {strategy}")
+    if group_index is None:
+        group_index = GroupIndex(df, group_feature)
+    if strategy == "most_frequent":
+        return get_group_modes(df, group_feature, target_feature, group_index)
+    if strategy == "mean":
+        values = _group_means(group_index, df[target_feature])
+    else:
+        values = _group_medians(group_index, df[target_feature])
+    return pd.Series(values, index=group_index.groups, name=target_feature)
+
+
+def fingerprint(df: pd.DataFrame, features: list) -> Optional[Hashable]:
+    # The cache key of statistics over some columns of the frame: the version
+    # the caller set in df.attrs["version"], with the shape and dtypes as a
+    # guard. Hashing the contents would cost as much as a mean or a mode, so
+    # frames without a version are not cached.
+    if "version" not in df.attrs:
+        return None
+    return (
+        df.attrs["version"],
+        len(df),
+        tuple(features),
+        tuple(str(df[feature].dtype) for feature in features),
+    )
+
+
+def _copy_statistics(value):
+    return value.copy() if isinstance(value, (pd.Series, pd.DataFrame)) else value
+
+
+class StatisticsCache:
+    # Opt-in LRU cache of fitted statistics shared by the imputers that are
+    # given it, so repeated runs over the same data skip the aggregation.
+    # Only frames with a version in df.attrs["version"] are cached, see
+    # fingerprint. Thread-safe, and callers always get their own copy.
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Optional[Hashable], compute: Callable[[], object]):
+        if key is None:
+            return compute()
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return _copy_statistics(self._cache[key])
+            self.misses += 1
+        # Computed outside the lock, so other imputers are not held up
+        value = compute()
+        with self._lock:
+            self._cache[key] = _copy_statistics(value)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __getstate__(self) -> dict:
+        # Locks cannot be pickled, e.g. for the processes backend
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def _can_fill_inplace(column: pd.Series, fill_value) -> bool:
+    if column.dtype == object or isinstance(column.dtype, pd.CategoricalDtype):
+        return True
+    if not is_float_dtype(column.dtype):
+        return False
+    if isinstance(fill_value, pd.Series):
+        return is_numeric_dtype(fill_value.dtype) and not is_bool_dtype(
+            fill_value.dtype
+        )
+    return is_number(fill_value) and not isinstance(fill_value, bool)
+
+
+def _is_string_fill(fill_value) -> bool:
+    if isinstance(fill_value, pd.Series):
+        return infer_dtype(fill_value, skipna=True) in ("string", "empty")
+    return isinstance(fill_value, str)
+
+
+def _add_categories(df: pd.DataFrame, feature: str, values) -> pd.Series:
+    column = df[feature]
+    categories = column.cat.categories
+    new_categories = [
+        value for value in pd.unique(np.atleast_1d(values)) if value not in categories
+    ]
+    if new_categories:
+        df[feature] = column.cat.add_categories(new_categories)
+    return df[feature]
+
+
+def convert_string_features(
+    df: pd.DataFrame,
+    features: Optional[Iterable[str]] = None,
+    dtype: Literal["category", "string[pyarrow]"] = "category",
+) -> pd.DataFrame:
+    # Object columns hold one Python string per cell; category and Arrow
+    # strings store them far more compactly and fill without new objects
+    if features is None:
+        features = df.select_dtypes(include=["object"]).columns
+    for feature in check_variables_is_list(features):
+        df[feature] = df[feature].astype(dtype)
+    return df
+
+
+def read_csv(
+    path: str,
+    string_dtype: Optional[Literal["category", "string[pyarrow]"]] = None,
+    string_features: Optional[Iterable[str]] = None,
+    **read_csv_kwargs,
+) -> pd.DataFrame:
+    if string_dtype is None:
+        return pd.read_csv(path, **read_csv_kwargs)
+    if string_features is None:
+        sample = pd.read_csv(path, nrows=1_000, **read_csv_kwargs)
+        string_features = sample.select_dtypes(include=["object"]).columns
+    dtypes = {feature: string_dtype for feature in string_features}
+    return pd.read_csv(path, dtype=dtypes, **read_csv_kwargs)
+
+
+class MissingIndex:
+    # Positions of the NaN cells of every column, built with a single scan of
+    # the frame. Imputers read it to visit only missing cells and refresh it
+    # after filling, so columns without NaNs left are skipped entirely.
+    def __init__(self, df: pd.DataFrame):
+        isna = df.isna()
+        self._positions = {}
+        for feature in df.columns:
+            positions = np.flatnonzero(isna[feature].to_numpy())
+            if len(positions):
+                self._positions[feature] = positions
+
+    def positions(self, feature: str) -> np.ndarray:
+        return self._positions.get(feature, np.array([], dtype=np.intp))
+
+    def has_missing(self, feature: str) -> bool:
+        return feature in self._positions
+
+    def refresh(self, df: pd.DataFrame, features: Optional[Iterable[str]] = None):
+        # Only the cells that were missing before are checked again
+        features = list(self._positions) if features is None else features
+        for feature in features:
+            positions = self._positions.get(feature)
+            if positions is None:
+                continue
+            positions = positions[pd.isna(df[feature].to_numpy()[positions])]
+            if len(positions):
+                self._positions[feature] = positions
+            else:
+                del self._positions[feature]
+
+    @property
+    def null_counts(self) -> pd.Series:
+        return pd.Series(
+            {feature: len(positions) for feature, positions in self._positions.items()},
+            dtype="int64",
+        )
+
+    @property
+    def null_count(self) -> int:
+        return sum(len(positions) for positions in self._positions.values())
+
+
+def fill_missing(
+    df: pd.DataFrame,
+    feature: str,
+    fill_value,
+    missing_index: Optional[MissingIndex] = None,
+) -> pd.DataFrame:
+    # Write fill values into the NaN cells of one column only. Fills that would
+    # change the column's dtype fall back to replacing the whole column.
+    column = df[feature]
+    if missing_index is None:
+        positions = np.flatnonzero(column.isna().to_numpy())
+    else:
+        positions = missing_index.positions(feature)
+    values = fill_value
+    if isinstance(fill_value, pd.Series):
+        values = fill_value.iloc[positions]
+        if column.dtype != object:
+            keep = values.notna().to_numpy()
+            positions, values = positions[keep], values[keep]
+        values = values.to_numpy()
+    elif pd.isna(fill_value) and column.dtype != object:
+        positions = positions[:0]
+    if len(positions):
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Fill values become new categories, the strings are never copied
+            column = _add_categories(df, feature, values)
+        if isinstance(column.dtype, pd.StringDtype):
+            # Arrow strings fill faster with their own kernel than per cell
+            if not _is_string_fill(fill_value):
+                column = column.astype(object)
+            df[feature] = column.fillna(fill_value)
+        elif _can_fill_inplace(column, fill_value):
+            df.iloc[positions, df.columns.get_loc(feature)] = values
+        else:
+            df[feature] = column.fillna(fill_value)
+    if missing_index is not None:
+        missing_index.refresh(df, [feature])
+    return df
+
+
+def _check_backend(backend: Backend):
+    if backend not in ("pandas", "numpy"):
+        raise ValueError(f"Invalid backend: {backend}")
+
+
+def _check_sampling(sample_size: Optional[int], cache: Optional[StatisticsCache]):
+    if sample_size is not None and sample_size < 1:
+        raise ValueError("sample_size must be at least 1")
+    if sample_size is not None and cache is not None:
+        raise ValueError("Sampled statistics are not cached")
+
+
+def _get_float_features(df: pd.DataFrame, features: list) -> list:
+    dtypes = df.dtypes
+    return [feature for feature in features if dtypes[feature] == np.float64]
+
+
+def _get_float_block(df: pd.DataFrame, features: list) -> np.ndarray:
+    # Column-major, so every column is contiguous and reduces like a Series
+    return np.asfortranarray(df[features].to_numpy(dtype=float))
+
+
+def get_block_statistics(
+    df: pd.DataFrame, features: list, strategy: Literal["median", "mean"]
+) -> np.ndarray:
+    # Statistics of several float64 columns in one call over a 2-D array
+    values = _get_float_block(df, features)
+    if strategy == "median":
+        with warnings.catch_warnings():
+            # All-NaN columns have no median, like in pandas
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nanmedian(values, axis=0)
+    # Same summation as pandas' nanmean, which zeroes the NaNs and sums
+    mask = np.isnan(values)
+    counts = len(values) - mask.sum(axis=0)
+    np.copyto(values, 0.0, where=mask)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return values.sum(axis=0) / counts
+
+
+def fill_missing_block(
+    df: pd.DataFrame,
+    features: list,
+    fill_values: Union[float, np.ndarray],
+    missing_index: Optional[MissingIndex] = None,
+) -> pd.DataFrame:
+    # Fill float64 columns from one 2-D array and write back, in place, only
+    # the columns that had NaNs
+    values = _get_float_block(df, features)
+    mask = np.isnan(values)
+    np.copyto(values, np.asarray(fill_values, dtype=float), where=mask)
+    changed = np.flatnonzero(mask.any(axis=0))
+    if len(changed):
+        positions = [df.columns.get_loc(features[i]) for i in changed]
+        df.iloc[:, positions] = values[:, changed]
+    if missing_index is not None:
+        missing_index.refresh(df, features)
+    return df
+
+
 class DataFrameImputer(ABC):
+    # Imputers that accept a missing_index keyword in impute and transform
+    supports_missing_index = False
+    # Imputers that accept a group_indexes keyword in impute
+    supports_group_index = False
+
     @abstractmethod
     def impute(self, df: pd.DataFrame) -> pd.DataFrame:
         pass
 
+    def fit(self, df: pd.DataFrame) -> "DataFrameImputer":
+        return self
+
+    def transform(self, df: pd.DataFrame, inplace: bool = True) -> pd.DataFrame:
+        if not inplace:
+            df = df.copy()
+        return self.impute(df)
+
+    @property
+    def read_features(self) -> Optional[list]:
+        # None means the imputer may read any column
+        return None
+
+    @property
+    def write_features(self) -> Optional[list]:
+        # None means the imputer may write any column
+        return None
+
+    def _check_is_fitted(self):
+        if getattr(self, "statistics_", None) is None:
+            raise ValueError(
+                f"{type(self).__name__} is not fitted yet, call fit before transform"
+            )
+
 
 class GroupStatisticImputer(DataFrameImputer):
+    supports_missing_index = True
+    supports_group_index = True
+
     def __init__(
         self,
         strategy: Literal["most_frequent", "median", "mean"],
-        group_feature: str,
-        target_feature: str,
+        group_feature: Union[str, list[str]],
+        target_feature: Union[str, list[str]],
+        engine: Literal["vectorized", "transform"] = "vectorized",
+        cache: Optional[StatisticsCache] = None,
+        fallback: Optional[list[Union[str, list[str]]]] = None,
+        min_group_size: int = 1,
+        sample_size: Optional[int] = None,
+        random_state: int = 0,
+        confidence: float = 0.95,
     ):
+        # Rows whose group has fewer than min_group_size non-missing targets
+        # take the statistic of the first fallback grouping that has enough,
+        # e.g. fallback=["Neighborhood", []] for Neighborhood, then global.
+        # With a sample_size, statistics come from a seeded sample of about
+        # that many values per group and bounds_ holds their confidence bounds.
+        if engine not in ("vectorized", "transform"):
+            raise ValueError(f"Invalid engine: {engine}")
+        if min_group_size < 1:
+            raise ValueError("min_group_size must be at least 1")
+        if engine == "transform" and (
+            fallback or min_group_size != 1 or sample_size is not None
+        ):
+            raise ValueError(
+                "The transform engine does not support fallback groups or sampling"
+            )
+        _check_sampling(sample_size, cache)
         self.strategy = strategy
         self.group_feature = group_feature
         self.target_feature = target_feature
+        self.group_features = check_variables_is_list(group_feature)
+        self.target_features = check_variables_is_list(target_feature)
+        self.engine = engine
+        self.cache = cache
+        self.fallback = [check_variables_is_list(level) for level in fallback or []]
+        self.min_group_size = min_group_size
+        self.sample_size = sample_size
+        self.random_state = random_state
+        self.confidence = confidence
+        self.statistics_ = None
+        self.fallback_statistics_ = []
+        self.bounds_ = None
 
-    def impute(self, df: pd.DataFrame) -> pd.DataFrame:
-        if df[self.group_feature].isna().any():
-            raise ValueError(
-                f"Group feature {self.group_feature} cannot contain NaN values"
+    def impute(
+        self,
+        df: pd.DataFrame,
+        inplace: bool = True,
+        missing_index: Optional[MissingIndex] = None,
+        group_indexes: Optional[dict] = None,
+    ) -> pd.DataFrame:
+        self._check_group_feature(df, missing_index)
+        if not inplace:
+            df = df.copy()
+        targets = self.target_features
+        if missing_index is not None:
+            targets = [t for t in targets if missing_index.has_missing(t)]
+            if not targets:
+                return df
+        if self.engine == "transform":
+            df = self._impute_with_transform(df, targets)
+            if missing_index is not None:
+                missing_index.refresh(df, targets)
+            return df
+        group_indexes = {} if group_indexes is None else group_indexes
+        self._fit(df, targets, group_indexes)
+        return self._transform(df, missing_index, group_indexes)
+
+    def fit(
+        self, df: pd.DataFrame, group_index: Optional[GroupIndex] = None
+    ) -> "GroupStatisticImputer":
+        self._check_group_feature(df)
+        self._fit(df, self.target_features, self._as_group_indexes(group_index))
+        return self
+
+    def transform(
+        self,
+        df: pd.DataFrame,
+        inplace: bool = True,
+        missing_index: Optional[MissingIndex] = None,
+        group_index: Optional[GroupIndex] = None,
+    ) -> pd.DataFrame:
+        self._check_is_fitted()
+        if group_index is None:
+            self._check_group_feature(df, missing_index)
+        if not inplace:
+            df = df.copy()
+        return self._transform(df, missing_index, self._as_group_indexes(group_index))
+
+    @property
+    def read_features(self) -> list:
+        return self.all_group_features + self.target_features
+
+    @property
+    def write_features(self) -> list:
+        return self.target_features
+
+    @property
+    def all_group_features(self) -> list:
+        # The group features followed by those only used by fallback levels
+        features = list(self.group_features)
+        for level in self.fallback:
+            features += [feature for feature in level if feature not in features]
+        return features
+
+    def _fit(self, df: pd.DataFrame, targets: list, group_indexes: dict):
+        self.bounds_ = None if self.sample_size is None else {}
+        self.statistics_ = self._compute_statistics(
+            df,
+            self._get_group_index(df, group_indexes, self.group_features),
+            targets,
+            self.bounds_,
+        )
+        self.fallback_statistics_ = [
+            self._compute_statistics(
+                df, self._get_group_index(df, group_indexes, level), targets
             )
+            for level in self.fallback
+        ]
+
+    def _transform(
+        self, df: pd.DataFrame, missing_index: Optional[MissingIndex], group_indexes: dict
+    ) -> pd.DataFrame:
+        fallback_statistics = [
+            dict(self._iter_statistics(statistics))
+            for statistics in self.fallback_statistics_
+        ]
+        for target, statistics in self._iter_statistics(self.statistics_):
+            fill_values = self._lookup(df, self.group_features, statistics, group_indexes)
+            # Each fallback level is one gather from its group table into the
+            # rows that are still without a fill value
+            for level, level_statistics in zip(self.fallback, fallback_statistics):
+                missing = pd.isna(fill_values)
+                if not missing.any():
+                    break
+                fill_values = np.where(
+                    missing,
+                    self._lookup(df, level, level_statistics[target], group_indexes),
+                    fill_values,
+                )
+            fill_missing(df, target, pd.Series(fill_values, index=df.index), missing_index)
+        return df
+
+    @staticmethod
+    def _lookup(
+        df: pd.DataFrame,
+        group_features: list,
+        statistics: pd.Series,
+        group_indexes: dict,
+    ) -> np.ndarray:
+        codes = get_group_codes(
+            df,
+            group_features,
+            statistics.index,
+            group_indexes.get(tuple(group_features)),
+        )
+        # Label -1 is missing from the positional index, so rows of unseen
+        # groups get NaN, like Series.map
+        return pd.Series(statistics.to_numpy()).reindex(codes).to_numpy()
+
+    @staticmethod
+    def _as_group_indexes(group_index: Optional[GroupIndex]) -> dict:
+        if group_index is None:
+            return {}
+        return {tuple(group_index.group_features): group_index}
+
+    @staticmethod
+    def _get_group_index(
+        df: pd.DataFrame, group_indexes: dict, group_features: list
+    ) -> GroupIndex:
+        key = tuple(group_features)
+        if key not in group_indexes:
+            group_indexes[key] = GroupIndex(df, group_features)
+        return group_indexes[key]
+
+    def _compute_statistics(
+        self,
+        df: pd.DataFrame,
+        group_index: GroupIndex,
+        targets: list,
+        bounds: Optional[dict] = None,
+    ) -> Union[pd.Series, pd.DataFrame]:
+        statistics = {}
+        for position, target in enumerate(targets):
+
+            def compute(target=target, position=position):
+                if self.sample_size is not None:
+                    return self._sample_statistics(
+                        df, group_index, target, position, bounds
+                    )
+                return get_group_statistics(
+                    df, group_index.group_features, target, self.strategy, group_index
+                )
+
+            if self.cache is None:
+                statistics[target] = compute()
+            else:
+                features = group_index.group_features + [target]
+                token = fingerprint(df, features)
+                key = None if token is None else ("group", self.strategy, token)
+                statistics[target] = self.cache.get_or_compute(key, compute)
+            if self.min_group_size > 1:
+                counts = pd.Series(
+                    group_index.observed_counts(df[target]), index=group_index.groups
+                )
+                large = counts.reindex(statistics[target].index) >= self.min_group_size
+                statistics[target] = statistics[target].where(large)
+        if isinstance(self.target_feature, str):
+            return statistics[self.target_feature]
+        return pd.DataFrame(
+            {
+                target: values.reindex(group_index.groups)
+                for target, values in statistics.items()
+            },
+            index=group_index.groups,
+        )
+
+    def _sample_statistics(
+        self,
+        df: pd.DataFrame,
+        group_index: GroupIndex,
+        target: str,
+        position: int,
+        bounds: Optional[dict],
+    ) -> pd.Series:
+        observed = np.flatnonzero(
+            df[target].notna().to_numpy() & (group_index.codes >= 0)
+        )
+        population_sizes = np.bincount(
+            group_index.codes[observed], minlength=group_index.n_groups
+        )
+        rng = np.random.default_rng([self.random_state, position])
+        sample = observed[
+            stratified_sample(
+                group_index.codes[observed], population_sizes, self.sample_size, rng
+            )
+        ]
+        sample_index = group_index.take(sample)
+        sample_df = df[[target]].iloc[sample]
+        statistics = get_group_statistics(
+            sample_df, group_index.group_features, target, self.strategy, sample_index
+        )
+        if bounds is not None:
+            bounds[target] = get_confidence_bounds(
+                sample_df[target].to_numpy(),
+                sample_index.codes,
+                population_sizes,
+                statistics.reindex(group_index.groups).to_numpy(),
+                self.strategy,
+                self.confidence,
+            ).set_index(group_index.groups)
+        return statistics
+
+    def _iter_statistics(self, statistics: Union[pd.Series, pd.DataFrame]):
+        if isinstance(statistics, pd.DataFrame):
+            return statistics.items()
+        return [(self.target_features[0], statistics)]
+
+    def _check_group_feature(
+        self, df: pd.DataFrame, missing_index: Optional[MissingIndex] = None
+    ):
+        for group_feature in self.all_group_features:
+            if missing_index is None:
+                has_missing = df[group_feature].isna().any()
+            else:
+                has_missing = missing_index.has_missing(group_feature)
+            if has_missing:
+                raise ValueError(
+                    f"Group feature {group_feature} cannot contain NaN values"
+                )
+
+    def _impute_with_transform(self, df: pd.DataFrame, targets: list) -> pd.DataFrame:
+        # Reference implementation: one Python call per group
         impute_function = get_strategy_function(self.strategy)
-        df[self.target_feature] = df.groupby(self.group_feature)[
-            self.target_feature
-        ].transform(impute_function)
+        for target in targets:
+            df[target] = df.groupby(self.group_features)[target].transform(
+                impute_function
+            )
         return df
 
 
 class ConstantImputer(DataFrameImputer):
+    supports_missing_index = True
+
     def __init__(
         self,
         features: Union[NumberOrStr, Iterable[NumberOrStr]],
         fill_value: NumberOrStr,
+        backend: Backend = "pandas",
     ):
-        self.features = features
+        _check_backend(backend)
+        self.features = check_variables_is_list(features)
         self.fill_value = fill_value
+        self.backend = backend
 
-    def impute(self, df: pd.DataFrame) -> pd.DataFrame:
-        df[self.features] = df[self.features].fillna(self.fill_value)
+    def impute(
+        self,
+        df: pd.DataFrame,
+        inplace: bool = True,
+        missing_index: Optional[MissingIndex] = None,
+    ) -> pd.DataFrame:
+        if not inplace:
+            df = df.copy()
+        features = self.features
+        if (
+            self.backend == "numpy"
+            and is_number(self.fill_value)
+            and not isinstance(self.fill_value, bool)
+        ):
+            block = _get_float_features(df, features)
+            if block:
+                fill_missing_block(df, block, self.fill_value, missing_index)
+                features = [feature for feature in features if feature not in block]
+        for feature in features:
+            fill_missing(df, feature, self.fill_value, missing_index)
         return df
 
+    @property
+    def read_features(self) -> list:
+        return self.features
+
+    @property
+    def write_features(self) -> list:
+        return self.features
+
+    @property
+    def statistics_(self) -> pd.Series:
+        # The fill value never depends on the data, so there is nothing to fit
+        return pd.Series(self.fill_value, index=self.features, dtype=object)
+
 
 class StatisticsImputer(DataFrameImputer):
+    supports_missing_index = True
+
     def __init__(
         self,
         features: Iterable[NumberOrStr],
         strategy: Literal["most_frequent", "median", "mean"],
+        cache: Optional[StatisticsCache] = None,
+        backend: Backend = "pandas",
+        sample_size: Optional[int] = None,
+        random_state: int = 0,
+        confidence: float = 0.95,
     ):
+        # With a sample_size, each statistic comes from a seeded sample of that
+        # many values and bounds_ holds its confidence bounds
+        _check_backend(backend)
+        if backend == "numpy" and cache is not None:
+            raise ValueError("The statistics cache requires the pandas backend")
+        _check_sampling(sample_size, cache)
         self.features = check_variables_is_list(features)
         self.strategy = strategy
+        self.cache = cache
+        self.backend = backend
+        self.sample_size = sample_size
+        self.random_state = random_state
+        self.confidence = confidence
+        self.statistics_ = None
+        self.bounds_ = None
 
-    def impute(self, df: pd.DataFrame) -> pd.DataFrame:
-        impute_function = get_strategy_function(self.strategy)
-        df[self.features] = df[self.features].apply(impute_function)
+    def impute(
+        self,
+        df: pd.DataFrame,
+        inplace: bool = True,
+        missing_index: Optional[MissingIndex] = None,
+    ) -> pd.DataFrame:
+        features = self.features
+        if missing_index is not None:
+            # Statistics are only needed for columns that still have NaNs
+            features = [f for f in features if missing_index.has_missing(f)]
+        self.statistics_ = self._compute_statistics(df, features)
+        return self.transform(df, inplace=inplace, missing_index=missing_index)
+
+    def fit(self, df: pd.DataFrame) -> "StatisticsImputer":
+        self.statistics_ = self._compute_statistics(df, self.features)
+        return self
+
+    def _compute_statistics(self, df: pd.DataFrame, features: list) -> pd.Series:
+        if self.sample_size is not None:
+            return self._sample_statistics(df, features)
+        statistics = {}
+        if self.backend == "numpy" and self.strategy in ("mean", "median"):
+            block = _get_float_features(df, features)
+            if block:
+                statistics = dict(
+                    zip(block, get_block_statistics(df, block, self.strategy))
+                )
+        for feature in features:
+            if feature not in statistics:
+                statistics[feature] = self._compute_statistic(df, feature)
+        return pd.Series(statistics, index=features, dtype=object)
+
+    def _sample_statistics(self, df: pd.DataFrame, features: list) -> pd.Series:
+        statistics = {}
+        bounds = []
+        for feature in features:
+            values = df[feature].dropna()
+            # Seeded by the feature's position in the imputer, so skipping
+            # columns without NaNs does not change the other samples
+            position = self.features.index(feature)
+            rng = np.random.default_rng([self.random_state, position])
+            sample = values.iloc[sample_positions(len(values), self.sample_size, rng)]
+            statistics[feature] = get_statistic(sample, self.strategy)
+            bounds.append(
+                get_confidence_bounds(
+                    sample.to_numpy(),
+                    np.zeros(len(sample), dtype=np.intp),
+                    np.array([len(values)]),
+                    np.array([statistics[feature]], dtype=object),
+                    self.strategy,
+                    self.confidence,
+                )
+            )
+        self.bounds_ = pd.concat(bounds).set_axis(features) if bounds else None
+        return pd.Series(statistics, index=features, dtype=object)
+
+    def _compute_statistic(self, df: pd.DataFrame, feature: str):
+        if self.cache is None:
+            return get_statistic(df[feature], self.strategy)
+        token = fingerprint(df, [feature])
+        key = None if token is None else ("column", self.strategy, token)
+        return self.cache.get_or_compute(
+            key, lambda: get_statistic(df[feature], self.strategy)
+        )
+
+    @property
+    def read_features(self) -> list:
+        return self.features
+
+    @property
+    def write_features(self) -> list:
+        return self.features
+
+    def transform(
+        self,
+        df: pd.DataFrame,
+        inplace: bool = True,
+        missing_index: Optional[MissingIndex] = None,
+    ) -> pd.DataFrame:
+        self._check_is_fitted()
+        if not inplace:
+            df = df.copy()
+        statistics = self.statistics_
+        if self.backend == "numpy":
+            block = [
+                feature
+                for feature in _get_float_features(df, list(statistics.index))
+                if is_number(statistics[feature])
+            ]
+            if block:
+                fill_missing_block(
+                    df, block, statistics[block].to_numpy(dtype=float), missing_index
+                )
+                statistics = statistics.drop(block)
+        for feature, fill_value in statistics.items():
+            fill_missing(df, feature, fill_value, missing_index)
         return df
 
 
+class RandomImputer(DataFrameImputer):
+    supports_missing_index = True
+
+    def __init__(
+        self,
+        features: Iterable[NumberOrStr],
+        group_feature: Optional[Union[str, list[str]]] = None,
+        weighted: bool = True,
+        random_state: int = 0,
+    ):
+        # Fills every NaN with a value drawn from the non-missing values of its
+        # column, or of its group with a group_feature. Weighted draws follow
+        # the value counts; unweighted ones pick every distinct value equally.
+        # Every fit seeds one generator per feature, which later transforms
+        # keep drawing from: a fitted imputer fills the same batches the same
+        # way, and successive batches get fresh draws instead of replaying
+        # the first one. Rows of groups without observed values keep their NaN.
+        self.features = check_variables_is_list(features)
+        self.group_feature = group_feature
+        self.group_features = (
+            [] if group_feature is None else check_variables_is_list(group_feature)
+        )
+        self.weighted = weighted
+        self.random_state = random_state
+        self.statistics_ = None
+        self.rngs_ = None
+
+    def impute(
+        self,
+        df: pd.DataFrame,
+        inplace: bool = True,
+        missing_index: Optional[MissingIndex] = None,
+    ) -> pd.DataFrame:
+        features = self.features
+        if missing_index is not None:
+            features = [f for f in features if missing_index.has_missing(f)]
+        self.statistics_ = self._compute_statistics(df, features)
+        return self.transform(df, inplace=inplace, missing_index=missing_index)
+
+    def fit(self, df: pd.DataFrame) -> "RandomImputer":
+        self.statistics_ = self._compute_statistics(df, self.features)
+        return self
+
+    def _compute_statistics(self, df: pd.DataFrame, features: list) -> dict:
+        # Value counts of every feature, the group keys factorized once
+        self.rngs_ = {
+            feature: np.random.default_rng([self.random_state, position])
+            for position, feature in enumerate(self.features)
+        }
+        group_index = GroupIndex(df, self.group_features)
+        return {
+            feature: get_group_value_counts(
+                df, self.group_features, feature, group_index
+            )
+            for feature in features
+        }
+
+    @property
+    def read_features(self) -> list:
+        return self.group_features + self.features
+
+    @property
+    def write_features(self) -> list:
+        return self.features
+
+    def transform(
+        self,
+        df: pd.DataFrame,
+        inplace: bool = True,
+        missing_index: Optional[MissingIndex] = None,
+    ) -> pd.DataFrame:
+        self._check_is_fitted()
+        if not inplace:
+            df = df.copy()
+        for feature, counts in self.statistics_.items():
+            if missing_index is None:
+                positions = np.flatnonzero(df[feature].isna().to_numpy())
+            else:
+                positions = missing_index.positions(feature)
+            if not len(positions):
+                continue
+            fill_values = self._draw(df, counts, positions, self.rngs_[feature])
+            fill_missing(df, feature, fill_values, missing_index)
+        return df
+
+    def _draw(
+        self,
+        df: pd.DataFrame,
+        counts: pd.Series,
+        positions: np.ndarray,
+        rng: np.random.Generator,
+    ) -> pd.Series:
+        if self.group_features:
+            group_codes, groups = counts.index.droplevel(-1).factorize()
+            group_starts = np.searchsorted(group_codes, np.arange(len(groups) + 1))
+            keys = df[self.group_features].iloc[positions]
+            codes = groups.get_indexer(_get_group_keys(keys, self.group_features))
+            values = counts.index.get_level_values(-1)
+        else:
+            group_starts = np.array([0, len(counts)])
+            codes = np.full(len(positions), 0 if len(counts) else -1, dtype=np.intp)
+            values = counts.index
+        drawn = np.full(len(df), -1, dtype=np.intp)
+        drawn[positions] = sample_from_counts(
+            counts.to_numpy(), group_starts, codes, self.weighted, rng
+        )
+        return pd.Series(
+            values.array.take(drawn, allow_fill=True), index=df.index
+        )
+
+
 def impute_missing_values(
+    df: pd.DataFrame,
+    imputers: Union[DataFrameImputer, list[DataFrameImputer]],
+    n_jobs: int = 1,
+    backend: Literal["threads", "processes"] = "threads",
+    inplace: bool = True,
+    missing_index: Optional[MissingIndex] = None,
+    callbacks: Optional[list] = None,
+    engine: Literal["pandas", "polars"] = "pandas",
+) -> pd.DataFrame:
+    # inplace=True fills the caller's frame and returns it; inplace=False works
+    # on a single up-front copy and never mutates the input. Callbacks, such as
+    # profiling.ImputationProfiler, are called before and after every imputer.
+    imputers_ = check_variables_is_list(imputers)
+    if engine == "polars":
+        return _impute_missing_values_polars(
+            df, imputers_, n_jobs, inplace, missing_index, callbacks
+        )
+    if engine != "pandas":
+        raise ValueError(f"Invalid engine: {engine}")
+    if not inplace:
+        df = df.copy()
+    if n_jobs != 1 and callbacks:
+        raise ValueError("Callbacks are only supported with n_jobs=1")
+    if n_jobs != 1:
+        from parallel import impute_missing_values_parallel
+
+        n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        df = impute_missing_values_parallel(df, imputers_, n_jobs, backend)
+        if missing_index is not None:
+            missing_index.refresh(df)
+        return df
+    # Group indexes are shared by imputers with the same grouping until an
+    # imputer writes one of the group columns
+    group_indexes = {}
+    for imputer in imputers_:
+        kwargs = {}
+        if imputer.supports_group_index:
+            kwargs["group_indexes"] = group_indexes
+        if missing_index is not None and imputer.supports_missing_index:
+            kwargs["missing_index"] = missing_index
+        if callbacks:
+            for callback in callbacks:
+                callback.on_imputer_start(imputer, df)
+            df = imputer.impute(df, **kwargs)
+            for callback in callbacks:
+                callback.on_imputer_end(imputer, df)
+        else:
+            df = imputer.impute(df, **kwargs)
+        if missing_index is not None and not imputer.supports_missing_index:
+            missing_index.refresh(df, imputer.write_features)
+        _invalidate_group_indexes(group_indexes, imputer.write_features)
+    return df
+
+
+def _impute_missing_values_polars(
+    df: pd.DataFrame,
+    imputers: list[DataFrameImputer],
+    n_jobs: int,
+    inplace: bool,
+    missing_index: Optional[MissingIndex],
+    callbacks: Optional[list],
+) -> pd.DataFrame:
+    # The whole chain runs as one lazy polars query, which is multithreaded
+    # on its own and returns a new frame
+    try:
+        from polars_engine import impute_missing_values_polars
+    except ImportError as error:
+        raise ImportError(
+            "The polars engine needs polars, "
+            "install it with: pip install 'refactor-function[polars]'"
+        ) from error
+
+    if n_jobs != 1 or callbacks:
+        raise ValueError("The polars engine does not support n_jobs or callbacks")
+    result = impute_missing_values_polars(df, imputers)
+    if missing_index is not None:
+        missing_index.refresh(result)
+    if not inplace:
+        return result
+    written = []
+    for imputer in imputers:
+        if imputer.write_features is None:
+            written = list(result.columns)
+            break
+        written += [feature for feature in imputer.write_features if feature not in written]
+    df[written] = result[written]
+    return df
+
+
+def _invalidate_group_indexes(group_indexes: dict, write_features: Optional[list]):
+    for group_features in list(group_indexes):
+        if write_features is None or not set(group_features).isdisjoint(
+            write_features
+        ):
+            del group_indexes[group_features]
+
+
+def fit_imputers(
     df: pd.DataFrame, imputers: Union[DataFrameImputer, list[DataFrameImputer]]
+) -> list[DataFrameImputer]:
+    # Each imputer is fitted on the output of the previous ones, as in
+    # impute_missing_values, so transform reproduces the same result
+    imputers_ = check_variables_is_list(imputers)
+    df = df.copy()
+    for imputer in imputers_:
+        df = imputer.fit(df).transform(df)
+    return imputers_
+
+
+def transform_missing_values(
+    df: pd.DataFrame,
+    imputers: Union[DataFrameImputer, list[DataFrameImputer]],
+    inplace: bool = True,
 ) -> pd.DataFrame:
     imputers_ = check_variables_is_list(imputers)
+    if not inplace:
+        df = df.copy()
     for imputer in imputers_:
-        df = imputer.impute(df)
+        df = imputer.transform(df)
     return df
 
 
-if __name__ == "__main__":
-    df = pd.read_csv("data/train.csv")
+def save_imputers(imputers: list[DataFrameImputer], path: str):
+    with open(path, "wb") as f:
+        pickle.dump(imputers, f, protocol=pickle.HIGHEST_PROTOCOL)
+
 
-    categorical_features = df.select_dtypes(include=["object"]).columns
-    numerical_features = df.select_dtypes(include=["int64", "float64"]).columns
+def load_imputers(path: str) -> list[DataFrameImputer]:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def get_default_imputers(df: pd.DataFrame) -> list[DataFrameImputer]:
+    # Only the column names and dtypes of df are used, so an empty frame with
+    # the file's schema is enough
+    categorical_features = df.select_dtypes(
+        include=["object", "category", "string"]
+    ).columns
+    # Any width, so the selection also works after downcast_dtypes
+    numerical_features = df.select_dtypes(include=["number"]).columns
 
     group_imputers = [
         GroupStatisticImputer(
@@ -133,6 +1424,12 @@ if __name__ == "__main__":
     statistic_imputers = [
         StatisticsImputer(features=categorical_features, strategy="most_frequent")
     ]
-    imputers = group_imputers + constant_imputers + statistic_imputers
-    df = impute_missing_values(df, imputers)
-    print(f"There are {df.isna().sum().sum()} null values after imputing")
+    return group_imputers + constant_imputers + statistic_imputers
+
+
+if __name__ == "__main__":
+    df = pd.read_csv("data/train.csv")
+    imputers = get_default_imputers(df)
+    missing_index = MissingIndex(df)
+    df = impute_missing_values(df, imputers, missing_index=missing_index)
+    print(f"There are {missing_index.null_count} null values after imputing")
@@ -0,0 +1,90 @@
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Optional
+import pandas as pd
+from process_data import DataFrameImputer
+
+
+class ImputerCallback:
+    # Hooks called by impute_missing_values around every imputer. Subclasses
+    # override the ones they need; the frame must not be modified.
+    def on_imputer_start(self, imputer: DataFrameImputer, df: pd.DataFrame):
+        pass
+
+    def on_imputer_end(self, imputer: DataFrameImputer, df: pd.DataFrame):
+        pass
+
+
+@dataclass
+class ImputerProfile:
+    position: int
+    imputer: str
+    seconds: float
+    cells_filled: int
+    columns_touched: list
+    peak_memory_bytes: Optional[int]
+
+
+class ImputationProfiler(ImputerCallback):
+    # Wall time, filled cells, touched columns and peak allocation of every
+    # imputer. Null counts are taken outside the timed section, and memory is
+    # only traced when trace_memory is set, since tracemalloc slows pandas down.
+    # A tracing session the caller already runs is left alone, so its peak is
+    # not reset and no peak is reported for the imputers.
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.profiles = []
+        self._null_counts = None
+        self._started_tracing = False
+        self._start = None
+
+    def on_imputer_start(self, imputer: DataFrameImputer, df: pd.DataFrame):
+        self._null_counts = _count_nulls(df, imputer.write_features)
+        if self.trace_memory:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+        self._start = time.perf_counter()
+
+    def on_imputer_end(self, imputer: DataFrameImputer, df: pd.DataFrame):
+        seconds = time.perf_counter() - self._start
+        peak = None
+        if self._started_tracing:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._started_tracing = False
+        null_counts = _count_nulls(df, list(self._null_counts.index))
+        filled = self._null_counts.sub(null_counts, fill_value=0)
+        self.profiles.append(
+            ImputerProfile(
+                position=len(self.profiles),
+                imputer=type(imputer).__name__,
+                seconds=seconds,
+                cells_filled=int(filled.sum()),
+                columns_touched=[str(feature) for feature in filled.index[filled != 0]],
+                peak_memory_bytes=peak,
+            )
+        )
+
+    def summary(self) -> dict:
+        return {
+            "total_seconds": sum(profile.seconds for profile in self.profiles),
+            "cells_filled": sum(profile.cells_filled for profile in self.profiles),
+            "imputers": [asdict(profile) for profile in self.profiles],
+        }
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        report = json.dumps(self.summary(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(report)
+        return report
+
+
+def _count_nulls(df: pd.DataFrame, features: Optional[list]) -> pd.Series:
+    # Imputers that do not declare their columns may write any of them
+    if features is None:
+        return df.isna().sum()
+    return df[[feature for feature in features if feature in df]].isna().sum()
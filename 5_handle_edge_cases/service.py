@@ -0,0 +1,158 @@
+import asyncio
+from typing import Optional
+import pandas as pd
+from process_data import DataFrameImputer, transform_missing_values
+from streaming import _is_stateless
+
+
+class MicroBatchImputer:
+    # Collects records from concurrent callers into one DataFrame and fills
+    # them with a single transform of pre-fitted imputers. A batch is closed
+    # when it holds max_batch_size records or max_wait seconds after its first
+    # record arrived, whichever comes first.
+    def __init__(
+        self,
+        imputers: list[DataFrameImputer],
+        max_batch_size: int = 256,
+        max_wait: float = 0.005,
+        columns: Optional[list[str]] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        for imputer in imputers:
+            if not _is_stateless(imputer):
+                imputer._check_is_fitted()
+        self.imputers = imputers
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.columns = columns
+        self.batch_sizes = []
+        self._queue = None
+        self._worker = None
+
+    async def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Records queued before stop are still imputed, so no caller is left
+        # waiting, and later ones are refused. None marks the end of the queue.
+        if self._worker is not None:
+            worker, self._worker = self._worker, None
+            await self._queue.put(None)
+            await worker
+
+    async def __aenter__(self) -> "MicroBatchImputer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def impute(self, record: dict) -> dict:
+        return (await self.impute_records([record]))[0]
+
+    async def impute_records(self, records: list[dict]) -> list[dict]:
+        if self._worker is None:
+            raise ValueError("The service is not started")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((records, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            request = await self._queue.get()
+            if request is None:
+                return
+            requests = [request]
+            n_records = len(request[0])
+            deadline = loop.time() + self.max_wait
+            while n_records < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                requests.append(request)
+                n_records += len(request[0])
+            self.batch_sizes.append(n_records)
+            # The pass runs in a thread, so the next batch fills up meanwhile
+            results = await asyncio.to_thread(self._impute_batch, requests)
+            for (_, future), result in zip(requests, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _impute_batch(self, requests: list[tuple]) -> list:
+        # Only requests with the same columns share a frame, so no caller gets
+        # NaN columns it never sent
+        batches = {}
+        for i, (records, _) in enumerate(requests):
+            batches.setdefault(self._get_columns(records), []).append(i)
+        results = [None] * len(requests)
+        for positions in batches.values():
+            batch = [requests[i][0] for i in positions]
+            for i, result in zip(positions, self._impute_same_columns(batch)):
+                results[i] = result
+        return results
+
+    def _impute_same_columns(self, requests: list[list[dict]]) -> list:
+        records = [record for request in requests for record in request]
+        try:
+            df = self._transform(records)
+        except Exception:
+            # A record that cannot be imputed only fails its own caller
+            return [self._impute_request(request) for request in requests]
+        # One conversion for the whole batch, then a list slice per caller.
+        # Imputers only write missing cells, so the values a caller sent are
+        # returned as sent, not upcast by another caller's missing ones.
+        rows = df.to_dict("records")
+        results = []
+        start = 0
+        for request in requests:
+            results.append(
+                [
+                    _restore_observed(row, record)
+                    for row, record in zip(rows[start : start + len(request)], request)
+                ]
+            )
+            start += len(request)
+        return results
+
+    def _get_columns(self, records: list[dict]) -> tuple:
+        if self.columns is not None:
+            return tuple(self.columns)
+        # The columns DataFrame.from_records builds for these records alone
+        return tuple(dict.fromkeys(key for record in records for key in record))
+
+    def _impute_request(self, records: list[dict]):
+        try:
+            return self._transform(records).to_dict("records")
+        except Exception as e:
+            return e
+
+    def _transform(self, records: list[dict]) -> pd.DataFrame:
+        df = pd.DataFrame.from_records(records, columns=self.columns)
+        return transform_missing_values(df, self.imputers)
+
+
+def _restore_observed(row: dict, record: dict) -> dict:
+    return {
+        key: value if _is_missing(record.get(key)) else record[key]
+        for key, value in row.items()
+    }
+
+
+def _is_missing(value) -> bool:
+    return pd.api.types.is_scalar(value) and pd.isna(value)
@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from pathlib import Path
+from typing import Optional, Union
+from columnar_io import read_frame, write_frame
+from incremental import to_incremental
+from process_data import DataFrameImputer, transform_missing_values
+from streaming import _is_stateless, _plan_fit_rounds
+from utils import check_variables_is_list
+
+
+def _fit_shard(
+    path: str, imputers: list[DataFrameImputer], rounds: list[int], round_: int
+) -> dict[int, DataFrameImputer]:
+    # Partial statistics of one shard for the imputers fitted in this round.
+    # Imputers of earlier rounds are already fitted and only transform.
+    df = read_frame(path)
+    partials = {}
+    for i, imputer in enumerate(imputers):
+        if rounds[i] > round_:
+            break
+        if rounds[i] == round_ and not _is_stateless(imputer):
+            partials[i] = to_incremental(imputer).partial_fit(df)
+        else:
+            df = imputer.transform(df)
+    return partials
+
+
+def _impute_shard(
+    input_path: str, output_path: str, imputers: list[DataFrameImputer]
+) -> str:
+    df = transform_missing_values(read_frame(input_path), imputers)
+    write_frame(df, output_path)
+    return output_path
+
+
+def fit_imputers_sharded(
+    paths: list[str],
+    imputers: Union[DataFrameImputer, list[DataFrameImputer]],
+    n_jobs: Optional[int] = None,
+    executor: Optional[ProcessPoolExecutor] = None,
+) -> list[DataFrameImputer]:
+    # Map: every worker reads one shard and returns mergeable partial state.
+    # Reduce: the partials are merged into the fill tables of the whole data.
+    # Median and most_frequent are exact, mean up to the order of summation.
+    imputers_ = check_variables_is_list(imputers)
+    if not paths:
+        raise ValueError("There are no shards to fit on")
+    rounds = _plan_fit_rounds(imputers_)
+    own_executor = executor is None
+    executor = executor or ProcessPoolExecutor(max_workers=n_jobs)
+    try:
+        for round_ in range(max(rounds, default=-1) + 1):
+            if all(
+                rounds[i] != round_ or _is_stateless(imputer)
+                for i, imputer in enumerate(imputers_)
+            ):
+                continue
+            futures = [
+                executor.submit(_fit_shard, path, imputers_, rounds, round_)
+                for path in paths
+            ]
+            partials = [future.result() for future in futures]
+            for i in partials[0]:
+                merged = reduce(
+                    lambda left, right: left.merge(right),
+                    (partial[i] for partial in partials),
+                )
+                imputers_[i].statistics_ = merged.statistics_
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return imputers_
+
+
+def get_output_paths(input_paths: list[str], output_dir: str) -> list[str]:
+    input_paths = [os.path.abspath(path) for path in input_paths]
+    if not input_paths:
+        return []
+    root = os.path.commonpath([os.path.dirname(path) for path in input_paths])
+    output_paths = [
+        os.path.join(output_dir, os.path.relpath(path, root)) for path in input_paths
+    ]
+    if len(set(output_paths)) < len(output_paths):
+        raise ValueError("Input paths must be distinct files")
+    return output_paths
+
+
+def impute_files_sharded(
+    input_paths: list[str],
+    output_dir: str,
+    imputers: Union[DataFrameImputer, list[DataFrameImputer]],
+    n_jobs: Optional[int] = None,
+) -> list[str]:
+    # Every shard is imputed with the global fill tables and written under
+    # its path relative to the inputs' common directory, so the partitioning
+    # of the input is kept, e.g. date=2024-01-01/part-0.parquet
+    output_paths = get_output_paths(input_paths, output_dir)
+    for output_path in output_paths:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        imputers_ = fit_imputers_sharded(input_paths, imputers, executor=executor)
+        futures = [
+            executor.submit(_impute_shard, input_path, output_path, imputers_)
+            for input_path, output_path in zip(input_paths, output_paths)
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,94 @@
+from typing import Optional, Union
+import pandas as pd
+from incremental import to_incremental
+from process_data import DataFrameImputer, transform_missing_values
+from utils import check_variables_is_list
+
+
+def _is_stateless(imputer: DataFrameImputer) -> bool:
+    return type(imputer).fit is DataFrameImputer.fit
+
+
+def _plan_fit_rounds(imputers: list[DataFrameImputer]) -> list[int]:
+    # An imputer that reads a column written by a not-yet-fitted imputer has to
+    # wait for the next pass over the file
+    rounds = []
+    round_ = 0
+    pending_writes = set()
+    pending_all = False
+    for imputer in imputers:
+        reads = imputer.read_features
+        if pending_all or (reads is None and pending_writes):
+            conflict = True
+        else:
+            conflict = reads is not None and not pending_writes.isdisjoint(reads)
+        if conflict:
+            round_ += 1
+            pending_writes = set()
+            pending_all = False
+        rounds.append(round_)
+        if not _is_stateless(imputer):
+            if imputer.write_features is None:
+                pending_all = True
+            else:
+                pending_writes.update(imputer.write_features)
+    return rounds
+
+
+# Median state per group during a streaming fit; None keeps exact counts
+DEFAULT_MAX_CENTROIDS = 2_000
+
+
+def fit_imputers_streaming(
+    path: str,
+    imputers: Union[DataFrameImputer, list[DataFrameImputer]],
+    chunksize: int = 100_000,
+    max_centroids: Optional[int] = DEFAULT_MAX_CENTROIDS,
+    **read_csv_kwargs,
+) -> list[DataFrameImputer]:
+    # Medians are exact while a group has at most max_centroids distinct
+    # values and approximate beyond, so the state stays bounded on
+    # continuous columns however long the file is
+    imputers_ = check_variables_is_list(imputers)
+    rounds = _plan_fit_rounds(imputers_)
+    for round_ in range(max(rounds, default=-1) + 1):
+        incremental = {
+            i: to_incremental(imputer, max_centroids)
+            for i, imputer in enumerate(imputers_)
+            if rounds[i] == round_ and not _is_stateless(imputer)
+        }
+        if not incremental:
+            continue
+        for chunk in pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs):
+            for i, imputer in enumerate(imputers_):
+                if rounds[i] > round_:
+                    break
+                if i in incremental:
+                    incremental[i].partial_fit(chunk)
+                else:
+                    chunk = imputer.transform(chunk)
+        for i, imputer in incremental.items():
+            imputers_[i].statistics_ = imputer.statistics_
+    return imputers_
+
+
+def impute_csv_streaming(
+    input_path: str,
+    output_path: str,
+    imputers: Union[DataFrameImputer, list[DataFrameImputer]],
+    chunksize: int = 100_000,
+    max_centroids: Optional[int] = DEFAULT_MAX_CENTROIDS,
+    **read_csv_kwargs,
+) -> list[DataFrameImputer]:
+    imputers_ = fit_imputers_streaming(
+        input_path,
+        imputers,
+        chunksize=chunksize,
+        max_centroids=max_centroids,
+        **read_csv_kwargs,
+    )
+    chunks = pd.read_csv(input_path, chunksize=chunksize, **read_csv_kwargs)
+    for i, chunk in enumerate(chunks):
+        chunk = transform_missing_values(chunk, imputers_)
+        chunk.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return imputers_
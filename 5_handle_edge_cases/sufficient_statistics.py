@@ -0,0 +1,197 @@
+from typing import Literal, Optional
+import numpy as np
+import pandas as pd
+
+
+def compress_value_counts(value_counts: pd.Series, max_centroids: int) -> pd.Series:
+    # Merging centroid sketch in the style of t-digest. A group with more than
+    # max_centroids distinct values is cut into max_centroids runs of equal
+    # rank mass, and every run becomes one centroid: its count-weighted mean
+    # value with its total count. The median of the centroids is then off by
+    # at most one run, and a group never keeps more than max_centroids
+    # entries. Groups within the limit keep their exact counts.
+    value_counts = value_counts.sort_index()
+    groups = value_counts.index.get_level_values(0)
+    codes = pd.factorize(groups)[0]
+    entries = np.bincount(codes)
+    if entries.max(initial=0) <= max_centroids:
+        return value_counts
+    counts = value_counts.to_numpy()
+    values = value_counts.index.get_level_values(1).to_numpy(dtype=float)
+    first = np.cumsum(entries) - entries
+    cumulative = np.cumsum(counts)
+    # Rank mass of the group before each entry, and the group's total
+    before = cumulative - counts - (cumulative - counts)[first][codes]
+    totals = np.bincount(codes, weights=counts)[codes]
+    runs = np.where(
+        entries[codes] <= max_centroids,
+        np.arange(len(codes)) - first[codes],
+        np.floor(before * max_centroids / totals),
+    ).astype(np.int64)
+    keys = codes.astype(np.int64) * max_centroids + runs
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    run_counts = np.add.reduceat(counts, starts)
+    run_values = np.add.reduceat(values * counts, starts) / run_counts
+    # Single-value runs keep their value exactly
+    single = np.diff(np.r_[starts, len(keys)]) == 1
+    run_values = np.where(single, values[starts], run_values)
+    index = pd.MultiIndex.from_arrays(
+        [groups[starts], run_values], names=value_counts.index.names
+    )
+    return pd.Series(run_counts, index=index)
+
+
+# Mergeable per-group state from which a fill value can be computed. Mean
+# keeps a running sum and count per group; median and most_frequent keep exact
+# (group, value) counts, so memory grows with the number of distinct values
+# instead of the number of rows. With max_centroids, median counts are
+# compressed into at most that many centroids per group, which bounds memory
+# on continuous columns at the cost of an approximate median. Without groups,
+# all rows share one group.
+#
+# Each update only aggregates its own batch. Batch partials are added into
+# the totals once they hold as many entries as the totals, so every entry is
+# re-added a bounded number of times instead of once per batch.
+class SufficientStatistics:
+    fields = ("sizes", "sums", "counts", "value_counts")
+
+    def __init__(
+        self,
+        strategy: Literal["most_frequent", "median", "mean"],
+        max_centroids: Optional[int] = None,
+    ):
+        if strategy not in ("most_frequent", "median", "mean"):
+            raise ValueError(f"Invalid strategy: {strategy}")
+        if max_centroids is not None and max_centroids < 1:
+            raise ValueError("max_centroids must be at least 1")
+        self.strategy = strategy
+        self.max_centroids = max_centroids
+        self.is_object = False
+        self._totals = dict.fromkeys(self.fields)
+        self._pending = {name: [] for name in self.fields}
+        self._pending_entries = dict.fromkeys(self.fields, 0)
+
+    @property
+    def sizes(self) -> Optional[pd.Series]:
+        return self._total("sizes")
+
+    @property
+    def sums(self) -> Optional[pd.Series]:
+        return self._total("sums")
+
+    @property
+    def counts(self) -> Optional[pd.Series]:
+        return self._total("counts")
+
+    @property
+    def value_counts(self) -> Optional[pd.Series]:
+        return self._total("value_counts")
+
+    def update(
+        self, values: pd.Series, groups: Optional[pd.Series] = None
+    ) -> "SufficientStatistics":
+        if groups is None:
+            groups = pd.Series(0, index=values.index)
+        frame = pd.DataFrame({"group": groups.to_numpy(), "value": values.to_numpy()})
+        grouped = frame.groupby("group", observed=True)["value"]
+        self._append("sizes", grouped.size())
+        self.is_object = self.is_object or values.dtype == object
+        if self.strategy == "mean":
+            self._append("sums", grouped.sum())
+            self._append("counts", grouped.count())
+        else:
+            self._append(
+                "value_counts", frame.groupby(["group", "value"], observed=True).size()
+            )
+        return self
+
+    def _append(self, name: str, partial: pd.Series):
+        self._pending[name].append(partial)
+        self._pending_entries[name] += len(partial)
+        total = self._totals[name]
+        if total is None or self._pending_entries[name] >= len(total):
+            self._compact(name)
+
+    def _total(self, name: str) -> Optional[pd.Series]:
+        self._compact(name)
+        return self._totals[name]
+
+    def _compact(self, name: str):
+        pending = self._pending[name]
+        if not pending:
+            return
+        total = self._totals[name]
+        parts = pending if total is None else [total, *pending]
+        # A single batch partial is already aggregated
+        total = parts[0]
+        if len(parts) > 1:
+            combined = pd.concat(parts)
+            levels = list(range(combined.index.nlevels))
+            total = combined.groupby(level=levels).sum()
+        if name == "value_counts" and self.strategy == "median":
+            if self.max_centroids is not None:
+                total = compress_value_counts(total, self.max_centroids)
+        self._totals[name] = total
+        self._pending[name] = []
+        self._pending_entries[name] = 0
+
+    def merge(self, other: "SufficientStatistics") -> "SufficientStatistics":
+        if other.strategy != self.strategy:
+            raise ValueError(
+                f"Cannot merge {other.strategy} statistics into {self.strategy}"
+            )
+        merged = SufficientStatistics(self.strategy, self.max_centroids)
+        for name in self.fields:
+            for state in (self, other):
+                if state._total(name) is not None:
+                    merged._pending[name].append(state._total(name))
+            merged._compact(name)
+        merged.is_object = self.is_object or other.is_object
+        return merged
+
+    def result(self) -> pd.Series:
+        # One fill value per group, matching get_group_statistics
+        if self.sizes is None:
+            return pd.Series(dtype=float)
+        if self.strategy == "mean":
+            return self.sums / self.counts
+        if self.value_counts is None or self.value_counts.empty:
+            values = pd.Series(dtype=float)
+        elif self.strategy == "median":
+            values = self._median()
+        else:
+            values = self._most_frequent()
+        if self.strategy == "median":
+            return values.reindex(self.sizes.index)
+        if self.is_object:
+            return values.reindex(self.sizes.index, fill_value=pd.NA)
+        return values
+
+    def global_result(self):
+        # Scalar fill value for the single implicit group, matching get_statistic
+        values = self.result()
+        if self.strategy == "most_frequent":
+            value = values.get(0, default=pd.NA)
+            return pd.NA if pd.isna(value) else value
+        return values.get(0, default=np.nan)
+
+    def _median(self) -> pd.Series:
+        value_counts = self.value_counts.sort_index()
+        cumulative = value_counts.groupby(level=0).cumsum()
+        totals = value_counts.groupby(level=0).transform("sum")
+        values = pd.Series(
+            value_counts.index.get_level_values(1), index=value_counts.index
+        )
+        lower = values[cumulative > (totals - 1) // 2].groupby(level=0).first()
+        upper = values[cumulative > totals // 2].groupby(level=0).first()
+        return (lower + upper) / 2
+
+    def _most_frequent(self) -> pd.Series:
+        value_counts = self.value_counts.sort_index().sort_values(
+            ascending=False, kind="stable"
+        )
+        groups = value_counts.index.get_level_values(0)
+        top = value_counts[~groups.duplicated()]
+        return pd.Series(
+            top.index.get_level_values(1), index=top.index.get_level_values(0)
+        )
@@ -1,12 +1,62 @@
+import asyncio
+import importlib.util
+import io
+import json
+import pickle
+import sys
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 from process_data import (
+    GroupIndex,
     GroupStatisticImputer,
     ConstantImputer,
     StatisticsImputer,
+    RandomImputer,
     impute_missing_values,
+    MissingIndex,
+    StatisticsCache,
+    convert_string_features,
+    get_group_statistics,
+    get_group_modes,
+    get_mode,
+    fit_imputers,
+    transform_missing_values,
+    save_imputers,
+    load_imputers,
 )
+from columnar_io import impute_file, main as columnar_io_main, read_frame
+from downcast import DowncastReport, downcast_dtypes
+from incremental import IncrementalGroupStatisticImputer, IncrementalStatisticsImputer
+from parallel import build_dependency_levels, shard_imputers
+from pipeline_config import (
+    compile_pipeline,
+    load_compiled_pipeline,
+    load_config,
+    run_pipeline,
+)
+from planner import plan_imputers
+from profiling import ImputationProfiler, ImputerCallback
+from service import MicroBatchImputer
+from sharded import impute_files_sharded
+from streaming import impute_csv_streaming
+from sufficient_statistics import SufficientStatistics
+from worker import ImputationWorker, WorkerServer, serve_stdio
+from worker_client import submit
 import pytest
 
+ENGINES = [
+    "pandas",
+    pytest.param(
+        "polars",
+        marks=pytest.mark.skipif(
+            importlib.util.find_spec("polars") is None, reason="polars is not installed"
+        ),
+    ),
+]
+
 
 class TestGroupStatisticImputer:
     def test_group_statistic_imputer(self):
@@ -28,6 +78,165 @@ class TestGroupStatisticImputer:
             )
             imputer.impute(df)
 
+    @pytest.mark.parametrize("strategy", ["mean", "median", "most_frequent"])
+    def test_vectorized_engine_matches_transform(self, strategy):
+        df = pd.DataFrame(
+            {
+                "Group": ["A", "A", "A", "B", "B", "C", "C"],
+                "Value": [1, 2, None, 3, None, None, None],
+                "Cat": ["x", "y", None, "z", None, None, None],
+            }
+        )
+        df["Date"] = pd.to_datetime(
+            ["2024-01-02", "2024-01-05", None, "2023-12-31", None, None, None]
+        ).tz_localize("Europe/Paris")
+        df["Delay"] = df["Date"] - pd.Timestamp("2023-12-30", tz="Europe/Paris")
+        targets = {
+            "mean": ["Value"],
+            "median": ["Value", "Date", "Delay"],
+            "most_frequent": ["Value", "Cat"],
+        }[strategy]
+        for target in targets:
+            expected = GroupStatisticImputer(
+                strategy=strategy,
+                group_feature="Group",
+                target_feature=target,
+                engine="transform",
+            ).impute(df.copy())
+            result = GroupStatisticImputer(
+                strategy=strategy, group_feature="Group", target_feature=target
+            ).impute(df.copy())
+            pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+    @pytest.mark.parametrize("dtype", ["float64", "float32", "int64"])
+    def test_vectorized_means_are_exact(self, dtype):
+        # Group sizes on both sides of numpy's pairwise summation block, and
+        # one group larger than its casting buffer
+        rng = np.random.default_rng(0)
+        groups = np.repeat(np.arange(61), [*rng.integers(1, 300, 60), 9_000])
+        values = pd.Series(rng.normal(size=len(groups)) * 1e3)
+        if dtype == "int64":
+            values = values.round().astype("int64")
+        else:
+            values = values.astype(dtype).mask(rng.random(len(groups)) < 0.3)
+        df = pd.DataFrame({"Group": rng.permutation(groups), "Value": values})
+        expected = GroupStatisticImputer(
+            "mean", "Group", ["Value"], engine="transform"
+        ).impute(df.copy())
+        imputer = GroupStatisticImputer("mean", "Group", ["Value"])
+        pd.testing.assert_frame_equal(imputer.impute(df.copy()), expected, check_exact=True)
+        means = df.groupby("Group")["Value"].apply(lambda series: series.mean())
+        np.testing.assert_array_equal(imputer.statistics_["Value"], means)
+
+    def test_multiple_group_features_and_targets(self):
+        df = pd.DataFrame(
+            {
+                "G1": ["A", "A", "A", "B", "B"],
+                "G2": [1, 1, 2, 1, 1],
+                "X": [1.0, None, 5.0, 3.0, None],
+                "Y": [None, 4.0, None, 6.0, None],
+            }
+        )
+        result = GroupStatisticImputer(
+            strategy="mean", group_feature=["G1", "G2"], target_feature=["X", "Y"]
+        ).impute(df.copy())
+        expected = df.copy()
+        for target in ["X", "Y"]:
+            expected[target] = expected[target].fillna(
+                expected.groupby(["G1", "G2"])[target].transform("mean")
+            )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_group_index_shared_across_imputers(self, monkeypatch):
+        df = pd.DataFrame(
+            {"Group": ["A", "A", "B", "B"], "X": [1, None, 3, None], "Y": [None, 2, None, 4]}
+        )
+        imputers = [
+            GroupStatisticImputer("mean", "Group", "X"),
+            GroupStatisticImputer("median", "Group", "Y"),
+        ]
+        created = []
+        original = GroupIndex.__init__
+
+        def counting_init(self, *args, **kwargs):
+            created.append(args)
+            original(self, *args, **kwargs)
+
+        monkeypatch.setattr(GroupIndex, "__init__", counting_init)
+        result = impute_missing_values(df, imputers)
+        assert len(created) == 1
+        assert result[["X", "Y"]].to_numpy().tolist() == [[1, 2], [1, 2], [3, 4], [3, 4]]
+
+
+class TestFallback:
+    def setup_method(self):
+        self.df = pd.DataFrame(
+            {
+                "N": ["a", "a", "a", "b", "b", "c"],
+                "S": [1, 1, 2, 1, 2, 2],
+                "V": [1.0, 3.0, None, 5.0, None, None],
+                "C": ["x", "x", None, None, None, None],
+            }
+        )
+
+    def test_fallback_chain(self):
+        result = GroupStatisticImputer(
+            "median", ["N", "S"], "V", fallback=["N", []]
+        ).impute(self.df.copy())
+        assert result["V"].tolist() == [1, 3, 2, 5, 5, 3]
+        result = GroupStatisticImputer(
+            "most_frequent", ["N", "S"], "C", fallback=["N", []]
+        ).impute(self.df.copy())
+        assert result["C"].tolist() == ["x"] * 6
+
+    def test_min_group_size(self):
+        result = GroupStatisticImputer(
+            "mean", "N", "V", min_group_size=2, fallback=[[]]
+        ).impute(self.df.copy())
+        assert result["V"].tolist() == [1, 3, 2, 5, 3, 3]
+        result = GroupStatisticImputer("mean", "N", "V", min_group_size=2).impute(
+            self.df.copy()
+        )
+        assert result["V"].isna().sum() == 2
+
+    def test_unseen_group_uses_fallback(self):
+        imputer = GroupStatisticImputer("mean", "N", "V", fallback=[[]]).fit(self.df)
+        result = imputer.transform(pd.DataFrame({"N": ["z"], "V": [None]}))
+        assert result["V"].tolist() == [3]
+
+
+class TestMode:
+    def test_mode_ties_go_to_smallest_value(self):
+        assert get_mode(pd.Series(["b", "a", None, "b", "a", "c"])) == "a"
+        assert pd.isna(get_mode(pd.Series([None, None], dtype=object)))
+
+    @pytest.mark.parametrize(
+        "values",
+        [
+            pd.Series([2.0, 1.0, np.nan, 2.0, 1.0]),
+            pd.Series([3, 1, 3, 1, 2]),
+            pd.Series(pd.Categorical(["y", None, "x"], categories=["z", "y", "x"])),
+            pd.Series(pd.Categorical([None, None], categories=["x"])),
+        ],
+    )
+    def test_mode_matches_series_mode(self, values):
+        expected = values.mode().get(0, default=pd.NA)
+        result = get_mode(values)
+        assert result == expected if not pd.isna(expected) else pd.isna(result)
+
+    def test_group_modes_match_series_mode(self):
+        df = pd.DataFrame(
+            {
+                "Group": [2, 1, 1, 2, 2, 3, 1],
+                "Value": ["y", "x", "z", "x", "y", None, "z"],
+            }
+        )
+        result = get_group_modes(df, "Group", "Value")
+        expected = df.groupby("Group")["Value"].agg(
+            lambda series: series.mode().get(0, default=pd.NA)
+        )
+        pd.testing.assert_series_equal(result, expected, check_names=False)
+
 
 class TestConstantImputer:
     def test_constant_imputer(self):
@@ -61,8 +270,30 @@ class TestStatisticsImputer:
         pd.testing.assert_frame_equal(result, expected, check_dtype=False)
 
 
+class TestNumpyBackend:
+    @pytest.mark.parametrize("strategy", ["mean", "median", "most_frequent"])
+    def test_numpy_backend_matches_pandas(self, strategy):
+        df = pd.DataFrame(
+            {
+                "A": [0.1, None, 0.7, 0.2, None],
+                "B": [None] * 5,
+                "C": [1, 2, 3, 4, 5],
+                "D": ["x", None, "y", "y", None],
+                "E": [3.0, 1.0, 2.0, 2.0, 8.0],
+            }
+        )
+        features = ["A", "B", "C", "E"] + (["D"] if strategy == "most_frequent" else [])
+        expected = StatisticsImputer(features, strategy).impute(df.copy())
+        result = StatisticsImputer(features, strategy, backend="numpy").impute(df.copy())
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+        expected = ConstantImputer(["A", "B", "D"], 0).impute(df.copy())
+        result = ConstantImputer(["A", "B", "D"], 0, backend="numpy").impute(df.copy())
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
 class TestImputeMissingValues:
-    def test_impute_missing_values(self):
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_impute_missing_values(self, engine):
         df = pd.DataFrame(
             {
                 "Cat": ["A", None, "B", "B"],
@@ -74,7 +305,7 @@ class TestImputeMissingValues:
             features=["Cat"], fill_value="Missing"
         )
         result = impute_missing_values(
-            df, [numerical_constant_imputer, categorical_constant_imputer]
+            df, [numerical_constant_imputer, categorical_constant_imputer], engine=engine
         )
         expected = pd.DataFrame(
             {
@@ -84,7 +315,8 @@ class TestImputeMissingValues:
         )
         pd.testing.assert_frame_equal(result, expected, check_dtype=False)
 
-    def test_impute_missing_values_one_imputer(self):
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_impute_missing_values_one_imputer(self, engine):
         df = pd.DataFrame(
             {
                 "Group": ["A", "A", "B", "B"],
@@ -95,5 +327,1040 @@ class TestImputeMissingValues:
         group_imputer = GroupStatisticImputer(
             strategy="mean", group_feature="Group", target_feature="Value"
         )
-        result = impute_missing_values(df, group_imputer)
+        result = impute_missing_values(df, group_imputer, engine=engine)
         pd.testing.assert_frame_equal(result, df, check_dtype=False)
+
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_group_feature_with_nan(self, engine):
+        df = pd.DataFrame({"Group": ["A", None], "Value": [1, None]})
+        with pytest.raises(ValueError):
+            impute_missing_values(
+                df, GroupStatisticImputer("mean", "Group", "Value"), engine=engine
+            )
+
+    @pytest.mark.skipif(
+        importlib.util.find_spec("polars") is None, reason="polars is not installed"
+    )
+    @pytest.mark.parametrize("strategy", ["mean", "median", "most_frequent"])
+    def test_polars_engine_matches_pandas(self, strategy):
+        df = pd.DataFrame(
+            {
+                "G1": ["a", "a", "a", "b", "b", "c", "c"],
+                "G2": [1, 1, 2, 1, 2, 2, 2],
+                "X": [1.0, 4.0, None, 2.0, None, None, 7.0],
+                "Y": [None, 2.0, 2.0, 5.0, 1.0, None, None],
+                "I": [1, 2, 3, 4, 5, 6, 7],
+                "C": ["x", "y", None, "y", "x", None, "z"],
+            }
+        )
+        targets = ["X", "Y", "C"] if strategy == "most_frequent" else ["X", "Y"]
+        imputers = [
+            GroupStatisticImputer(strategy, ["G1", "G2"], targets, fallback=["G1", []]),
+            GroupStatisticImputer(strategy, "G1", "X", min_group_size=2),
+            StatisticsImputer(["X", "Y", "I"], strategy),
+            ConstantImputer(["C"], "Missing"),
+        ]
+        expected = impute_missing_values(df.copy(), imputers)
+        result = impute_missing_values(df.copy(), imputers, engine="polars")
+        pd.testing.assert_frame_equal(result, expected)
+
+    @pytest.mark.skipif(
+        importlib.util.find_spec("polars") is None, reason="polars is not installed"
+    )
+    def test_polars_constants_keep_column_dtypes(self):
+        import polars as pl
+        from polars_engine import impute_lazy
+
+        df = pd.DataFrame(
+            {"A": [1.0, None], "B": ["b", None], "C": [2.0, None], "I": [1, 2]}
+        )
+        for imputers in [
+            [ConstantImputer(["A"], 0), ConstantImputer(["C", "B"], "Missing")],
+            [ConstantImputer(["A", "B"], 0), StatisticsImputer(["C"], "mean")],
+            [ConstantImputer(["A", "C"], 1), ConstantImputer(["I", "C"], 2.5)],
+        ]:
+            expected = impute_missing_values(df.copy(), imputers)
+            result = impute_missing_values(df.copy(), imputers, engine="polars")
+            pd.testing.assert_frame_equal(result, expected)
+        with pytest.raises(ValueError):
+            impute_lazy(pl.from_pandas(df).lazy(), ConstantImputer(["A"], "Missing"))
+        lf = impute_lazy(pl.from_pandas(df).lazy(), ConstantImputer(["A", "I"], 0))
+        assert lf.collect_schema() == pl.from_pandas(df).schema
+        # Building the query does not scan the input
+        scans = []
+        lf = pl.from_pandas(df).lazy().map_batches(lambda batch: scans.append(1) or batch)
+        impute_lazy(lf, [GroupStatisticImputer("mean", "B", "A"), ConstantImputer("C", 0)])
+        assert not scans
+
+    @pytest.mark.skipif(
+        importlib.util.find_spec("polars") is None, reason="polars is not installed"
+    )
+    def test_polars_falls_back_to_pandas(self):
+        import polars as pl
+        from polars_engine import impute_lazy
+
+        class Halved(StatisticsImputer):
+            def _compute_statistics(self, df, features):
+                return super()._compute_statistics(df, features) / 2
+
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(
+            {
+                "G": rng.integers(0, 3, 200),
+                "X": rng.normal(size=200),
+                "Y": rng.normal(size=200),
+                "Z": rng.normal(size=200),
+            }
+        ).mask(rng.random((200, 4)) < 0.2)
+        df["G"] = df["G"].fillna(0)
+        df.attrs["version"] = 1
+        make_imputers = lambda cache: [
+            ConstantImputer(["Z"], 0.5),
+            GroupStatisticImputer("median", "G", "X", sample_size=20),
+            StatisticsImputer(["Y"], "mean", cache=cache),
+            ConstantImputer(["X"], 0, backend="numpy"),
+            IncrementalStatisticsImputer(["Y"], "mean"),
+            Halved(["X"], "mean"),
+            RandomImputer(["X", "Y"]),
+        ]
+        for imputer in make_imputers(StatisticsCache())[1:]:
+            with pytest.raises(ValueError):
+                impute_lazy(pl.from_pandas(df).lazy(), imputer)
+        for i in range(1, len(make_imputers(None))):
+            pandas_cache, polars_cache = StatisticsCache(), StatisticsCache()
+            expected = impute_missing_values(
+                df.copy(), make_imputers(pandas_cache)[i:]
+            )
+            imputers = make_imputers(polars_cache)[i:]
+            result = impute_missing_values(df.copy(), imputers, engine="polars")
+            pd.testing.assert_frame_equal(result, expected)
+            assert len(polars_cache._cache) == len(pandas_cache._cache)
+
+    def test_missing_polars_names_the_extra(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "polars_engine", None)
+        with pytest.raises(ImportError, match=r"\[polars\]"):
+            impute_missing_values(
+                pd.DataFrame({"X": [1.0, None]}), ConstantImputer("X", 0), engine="polars"
+            )
+
+    @pytest.mark.skipif(
+        importlib.util.find_spec("polars") is None, reason="polars is not installed"
+    )
+    def test_polars_keeps_category_order(self):
+        df = pd.DataFrame(
+            {"C": pd.Categorical(["v", None, "u"], categories=["u", "v"], ordered=True)}
+        )
+        imputers = [ConstantImputer(["C"], "Missing")]
+        expected = impute_missing_values(df.copy(), imputers)
+        result = impute_missing_values(df.copy(), imputers, engine="polars")
+        assert list(result["C"].cat.categories) == ["u", "v", "Missing"]
+        pd.testing.assert_frame_equal(result, expected)
+
+
+class TestFitTransform:
+    def test_transform_uses_fitted_statistics(self):
+        train = pd.DataFrame({"Group": ["A", "A", "B"], "Value": [1, 3, 5]})
+        batch = pd.DataFrame({"Group": ["A", "B", "C"], "Value": [None, None, None]})
+        imputer = GroupStatisticImputer(
+            strategy="mean", group_feature="Group", target_feature="Value"
+        ).fit(train)
+        result = imputer.transform(batch)
+        expected = pd.DataFrame({"Group": ["A", "B", "C"], "Value": [2, 5, None]})
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_transform_before_fit(self):
+        with pytest.raises(ValueError):
+            StatisticsImputer(features=["A"], strategy="mean").transform(
+                pd.DataFrame({"A": [1, None]})
+            )
+
+    def test_saved_imputers_match_impute(self, tmp_path):
+        df = pd.DataFrame(
+            {
+                "Group": ["A", "A", "B", "B"],
+                "Value": [1, None, 3, None],
+                "Cat": ["x", None, "x", "y"],
+            }
+        )
+        imputers = [
+            GroupStatisticImputer(
+                strategy="median", group_feature="Group", target_feature="Value"
+            ),
+            StatisticsImputer(features=["Cat"], strategy="most_frequent"),
+            ConstantImputer(features=["Value"], fill_value=0),
+        ]
+        save_imputers(fit_imputers(df, imputers), tmp_path / "imputers.pkl")
+        result = transform_missing_values(
+            df.copy(), load_imputers(tmp_path / "imputers.pkl")
+        )
+        expected = impute_missing_values(df.copy(), imputers)
+        pd.testing.assert_frame_equal(result, expected)
+
+
+class TestPlanImputers:
+    def test_fused_plan_matches_sequential(self):
+        df = pd.DataFrame(
+            {
+                "A": [1, None, 3],
+                "B": ["x", None, "x"],
+                "C": [None, "y", "y"],
+                "D": [None, 2.5, 1.5],
+            }
+        )
+        imputers = [
+            ConstantImputer(features=["A"], fill_value=0),
+            ConstantImputer(features=["B", "D"], fill_value=-1),
+            ConstantImputer(features=["A", "C"], fill_value="Missing"),
+            StatisticsImputer(features=["B", "C"], strategy="most_frequent"),
+        ]
+        plan = plan_imputers(imputers)
+        result = impute_missing_values(df.copy(), plan.steps)
+        expected = impute_missing_values(df.copy(), imputers)
+        pd.testing.assert_frame_equal(result, expected)
+        assert len(plan.steps) == 1
+        assert plan.column_passes_saved == 3
+
+    def test_fused_constants_fill_categories(self):
+        df = pd.DataFrame(
+            {
+                "A": pd.Categorical(["x", None, "y"]),
+                "B": [None, 1.0, 2.0],
+                "C": [None, 3.0, None],
+            }
+        )
+        imputers = [
+            ConstantImputer(features=["A"], fill_value="Missing"),
+            ConstantImputer(features=["B", "C"], fill_value=0),
+        ]
+        plan = plan_imputers(imputers)
+        missing_index = MissingIndex(df)
+        result = impute_missing_values(
+            df.copy(), plan.steps, missing_index=missing_index
+        )
+        expected = impute_missing_values(df.copy(), imputers)
+        pd.testing.assert_frame_equal(result, expected)
+        assert missing_index.null_count == 0
+
+
+class TestStreaming:
+    def test_streaming_matches_in_memory(self, tmp_path):
+        df = pd.DataFrame(
+            {
+                "Group": ["A", "A", "B", "B", "A", "B", "C"],
+                "Value": [1, None, 3, None, 4, 8, None],
+                "Cat": ["x", None, "y", "y", None, "x", "y"],
+            }
+        )
+        df.to_csv(tmp_path / "input.csv", index=False)
+
+        def make_imputers():
+            return [
+                GroupStatisticImputer(
+                    strategy="median", group_feature="Group", target_feature="Value"
+                ),
+                StatisticsImputer(features=["Value"], strategy="mean"),
+                StatisticsImputer(features=["Cat"], strategy="most_frequent"),
+            ]
+
+        impute_csv_streaming(
+            tmp_path / "input.csv", tmp_path / "output.csv", make_imputers(), chunksize=2
+        )
+        result = pd.read_csv(tmp_path / "output.csv")
+        expected = impute_missing_values(df, make_imputers())
+        pd.testing.assert_frame_equal(result, expected)
+
+    @pytest.mark.parametrize("strategy", ["mean", "median", "most_frequent"])
+    def test_merged_statistics_match_full_data(self, strategy):
+        values = pd.Series([3, 1, None, 1, 7, 3, 2, None])
+        groups = pd.Series(["A", "B", "A", "A", "B", "A", "B", "C"])
+        left = SufficientStatistics(strategy).update(values[:3], groups[:3])
+        right = SufficientStatistics(strategy).update(values[3:], groups[3:])
+        result = left.merge(right).result()
+        expected = get_group_statistics(
+            pd.DataFrame({"Group": groups, "Value": values}), "Group", "Value", strategy
+        )
+        pd.testing.assert_series_equal(
+            result, expected, check_names=False, check_index_type=False
+        )
+
+    def test_median_sketch_is_bounded(self):
+        rng = np.random.default_rng(0)
+        values = pd.Series(rng.lognormal(size=40_000))
+        groups = pd.Series(rng.integers(0, 2, 40_000))
+        state = SufficientStatistics("median", max_centroids=200)
+        for start in range(0, 40_000, 5_000):
+            state.update(values[start : start + 5_000], groups[start : start + 5_000])
+        assert len(state.value_counts) <= 2 * 200
+        for group, median in state.result().items():
+            sorted_values = np.sort(values[groups == group])
+            rank = np.searchsorted(sorted_values, median) / len(sorted_values)
+            assert abs(rank - 0.5) < 0.01
+        exact = SufficientStatistics("median", max_centroids=200).update(values[:100])
+        assert exact.global_result() == values[:100].median()
+
+
+class TestParallel:
+    @pytest.mark.parametrize("backend", ["threads", "processes"])
+    def test_parallel_matches_sequential(self, backend):
+        df = pd.DataFrame(
+            {
+                "Group": ["A", "A", "B", "B"],
+                "Value": [1, None, 3, None],
+                "Cat": ["x", None, "y", "y"],
+                "Other": [None, "z", None, "z"],
+                "Num": [None, 2.0, None, 4.0],
+            }
+        )
+        imputers = [
+            GroupStatisticImputer(
+                strategy="mean", group_feature="Group", target_feature="Value"
+            ),
+            StatisticsImputer(features=["Cat", "Other", "Num"], strategy="most_frequent"),
+            ConstantImputer(features=["Value", "Num"], fill_value=0),
+        ]
+        expected = impute_missing_values(df.copy(), imputers)
+        statistics = [imputer.statistics_ for imputer in imputers[:2]]
+        for imputer in imputers[:2]:
+            imputer.statistics_ = None
+        result = impute_missing_values(df.copy(), imputers, n_jobs=2, backend=backend)
+        pd.testing.assert_frame_equal(result, expected)
+        # The caller's imputers are fitted, as after a sequential run
+        pd.testing.assert_series_equal(imputers[0].statistics_, statistics[0])
+        pd.testing.assert_series_equal(imputers[1].statistics_, statistics[1])
+        batch = pd.DataFrame({"Group": ["B"], **dict.fromkeys(df.columns[1:], [None])})
+        transformed = transform_missing_values(batch, imputers[:2])
+        assert transformed.iloc[0].tolist() == ["B", 3.0, "y", "z", 2.0]
+
+    def test_dependency_levels(self):
+        imputers = [
+            GroupStatisticImputer(
+                strategy="mean", group_feature="Group", target_feature="Value"
+            ),
+            ConstantImputer(features=["Cat"], fill_value="Missing"),
+            ConstantImputer(features=["Value"], fill_value=0),
+        ]
+        assert build_dependency_levels(imputers) == [[0, 1], [2]]
+
+
+class TestInplace:
+    def make_imputers(self):
+        return [
+            GroupStatisticImputer(
+                strategy="mean", group_feature="Group", target_feature="Value"
+            ),
+            StatisticsImputer(features=["Cat"], strategy="most_frequent"),
+        ]
+
+    def test_copy_does_not_mutate_input(self):
+        df = pd.DataFrame(
+            {"Group": ["A", "A", "B"], "Value": [1, None, 3], "Cat": ["x", None, "x"]}
+        )
+        original = df.copy()
+        result = impute_missing_values(df, self.make_imputers(), inplace=False)
+        pd.testing.assert_frame_equal(df, original)
+        assert result.notna().all().all()
+
+    def test_inplace_fills_caller_frame(self):
+        df = pd.DataFrame(
+            {"Group": ["A", "A", "B"], "Value": [1, None, 3], "Cat": ["x", None, "x"]}
+        )
+        result = impute_missing_values(df, self.make_imputers(), inplace=True)
+        assert result is df
+        assert df.notna().all().all()
+
+    def test_inplace_with_copy_on_write(self):
+        df = pd.DataFrame({"A": [1.0, None, 3.0], "B": ["x", None, "y"]})
+        with pd.option_context("mode.copy_on_write", True):
+            ConstantImputer(features=["A", "B"], fill_value=0).impute(df)
+        expected = pd.DataFrame({"A": [1.0, 0.0, 3.0], "B": ["x", 0, "y"]})
+        pd.testing.assert_frame_equal(df, expected)
+
+
+class TestMissingIndex:
+    def test_index_tracks_remaining_nulls(self):
+        df = pd.DataFrame(
+            {
+                "Group": ["A", "A", "B", "C"],
+                "Value": [1, None, 3, None],
+                "Cat": [None, "x", None, "y"],
+                "Full": [1, 2, 3, 4],
+            }
+        )
+        missing_index = MissingIndex(df)
+        assert missing_index.null_count == 4
+        assert not missing_index.has_missing("Full")
+        imputers = [
+            GroupStatisticImputer(
+                strategy="mean", group_feature="Group", target_feature="Value"
+            ),
+            StatisticsImputer(features=["Cat", "Full"], strategy="most_frequent"),
+        ]
+        expected = impute_missing_values(df.copy(), imputers)
+        result = impute_missing_values(df, imputers, missing_index=missing_index)
+        pd.testing.assert_frame_equal(result, expected)
+        assert missing_index.null_count == result.isna().sum().sum() == 1
+        assert list(missing_index.positions("Value")) == [3]
+
+    def test_group_feature_nan_from_index(self):
+        df = pd.DataFrame({"Group": ["A", None], "Value": [1, None]})
+        imputer = GroupStatisticImputer(
+            strategy="mean", group_feature="Group", target_feature="Value"
+        )
+        with pytest.raises(ValueError):
+            imputer.impute(df, missing_index=MissingIndex(df))
+
+
+class TestStringDtypes:
+    @pytest.mark.parametrize("dtype", ["category", "string[pyarrow]"])
+    def test_fill_keeps_string_dtype(self, dtype):
+        pytest.importorskip("pyarrow")
+        df = convert_string_features(
+            pd.DataFrame({"Group": ["A", "A", "B"], "Cat": ["x", None, None]}),
+            dtype=dtype,
+        )
+        imputers = [
+            GroupStatisticImputer(
+                strategy="most_frequent", group_feature="Group", target_feature="Cat"
+            ),
+            ConstantImputer(features=["Cat"], fill_value="Missing"),
+        ]
+        result = impute_missing_values(df, imputers)
+        assert result["Cat"].dtype == dtype
+        assert result["Cat"].tolist() == ["x", "x", "Missing"]
+
+
+class TestStatisticsCache:
+    def test_repeated_runs_hit_cache(self):
+        cache = StatisticsCache(maxsize=8)
+        df = pd.DataFrame({"Group": ["A", "A", "B"], "Value": [1, None, 3]})
+        df.attrs["version"] = 1
+
+        def run():
+            imputers = [
+                GroupStatisticImputer(
+                    strategy="mean",
+                    group_feature="Group",
+                    target_feature="Value",
+                    cache=cache,
+                ),
+                StatisticsImputer(features=["Value"], strategy="median", cache=cache),
+            ]
+            return impute_missing_values(df.copy(), imputers)
+
+        expected = run()
+        pd.testing.assert_frame_equal(run(), expected)
+        assert (cache.hits, cache.misses) == (2, 2)
+        # Frames without a version are not hashed, and not cached
+        del df.attrs["version"]
+        pd.testing.assert_frame_equal(run(), expected)
+        assert (cache.hits, cache.misses, len(cache)) == (2, 2, 2)
+
+    def test_lru_eviction(self):
+        cache = StatisticsCache(maxsize=1)
+        imputer = StatisticsImputer(features=["A"], strategy="mean", cache=cache)
+        first = pd.DataFrame({"A": [1, None]})
+        second = pd.DataFrame({"A": [2, None]})
+        first.attrs["version"], second.attrs["version"] = "first", "second"
+        imputer.impute(first.copy())
+        imputer.impute(second.copy())
+        imputer.impute(first.copy())
+        assert (cache.hits, cache.misses, len(cache)) == (0, 3, 1)
+
+    def test_cached_statistics_are_copies(self):
+        cache = StatisticsCache()
+        df = pd.DataFrame({"Group": ["A", "A", "B"], "Value": [1, None, 3]})
+        df.attrs["version"] = 1
+        imputer = GroupStatisticImputer("mean", "Group", "Value", cache=cache)
+        imputer.fit(df).statistics_["A"] = 100
+        assert imputer.fit(df).statistics_.to_dict() == {"A": 1.0, "B": 3.0}
+
+    def test_shared_across_threads_and_processes(self):
+        cache = StatisticsCache(maxsize=4)
+        keys = [i % 8 for i in range(2_000)]
+        with ThreadPoolExecutor(8) as executor:
+            values = list(
+                executor.map(lambda key: cache.get_or_compute(key, lambda: key), keys)
+            )
+        assert values == keys and len(cache) == 4
+        assert cache.hits + cache.misses == len(keys)
+        copied = pickle.loads(pickle.dumps(cache))
+        assert copied.get_or_compute(7, lambda: None) == cache.get_or_compute(7, list)
+
+    def test_planned_and_sharded_imputers_keep_cache(self):
+        cache = StatisticsCache()
+        imputers = [
+            ConstantImputer(features=["A"], fill_value=0),
+            StatisticsImputer(features=["A", "B"], strategy="mean", cache=cache),
+            StatisticsImputer(features=["C"], strategy="mean", cache=cache),
+            StatisticsImputer(features=["D"], strategy="mean"),
+        ]
+        steps = plan_imputers(imputers).steps
+        assert [step.features for step in steps[1:]] == [["B", "C"], ["D"]]
+        assert [step.cache for step in steps[1:]] == [cache, None]
+        sharded = shard_imputers(steps[1:2], n_shards=2)
+        assert [step.cache for step in sharded] == [cache, cache]
+
+
+class TestIncremental:
+    @pytest.mark.parametrize("strategy", ["mean", "median", "most_frequent"])
+    def test_partial_fit_and_merge_match_full_fit(self, strategy):
+        df = pd.DataFrame(
+            {
+                "Group": ["A", "B", "A", "A", "B", "A", "B", "C"],
+                "Value": [3, 1, None, 1, 7, 3, 2, None],
+            }
+        )
+        full = GroupStatisticImputer(
+            strategy=strategy, group_feature="Group", target_feature="Value"
+        ).fit(df)
+        online = IncrementalGroupStatisticImputer(strategy, "Group", "Value")
+        online.partial_fit(df[:3]).partial_fit(df[3:])
+        left = IncrementalStatisticsImputer(["Value"], strategy).partial_fit(df[:5])
+        right = IncrementalStatisticsImputer(["Value"], strategy).partial_fit(df[5:])
+        merged = left.merge(right)
+
+        expected = full.transform(df.copy())
+        pd.testing.assert_frame_equal(online.transform(df.copy()), expected)
+        assert merged.statistics_["Value"] == StatisticsImputer(
+            ["Value"], strategy
+        ).fit(df).statistics_["Value"]
+
+    @pytest.mark.parametrize("strategy", ["mean", "median", "most_frequent"])
+    def test_statistics_are_computed_once_after_many_batches(
+        self, strategy, monkeypatch
+    ):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(
+            {"Group": rng.integers(0, 20, 2_000), "Value": rng.integers(0, 9, 2_000)}
+        )
+        df["Value"] = df["Value"].where(rng.random(2_000) > 0.1)
+        calls = []
+        result = SufficientStatistics.result
+        monkeypatch.setattr(
+            SufficientStatistics,
+            "result",
+            lambda state: calls.append(state) or result(state),
+        )
+        online = IncrementalGroupStatisticImputer(strategy, "Group", "Value")
+        for start in range(0, len(df), 50):
+            online.partial_fit(df[start : start + 50])
+        expected = GroupStatisticImputer(strategy, "Group", "Value").fit(df)
+        pd.testing.assert_series_equal(
+            online.statistics_.sort_index(), expected.statistics_, check_names=False
+        )
+        online.transform(df.copy())
+        assert len(calls) == 1
+
+    @pytest.mark.parametrize("strategy", ["mean", "median", "most_frequent"])
+    def test_list_features_match_full_fit(self, strategy, tmp_path):
+        df = pd.DataFrame(
+            {
+                "Group": ["A", "B", "A", "A", "B", "A", "B", "C"],
+                "Sub": [1, 1, 2, 1, 1, 2, 2, 1],
+                "X": [3, 1, None, 1, 7, 3, 2, None],
+                "Y": [None, 0.5, 1.5, 2.5, None, 1.5, 0.5, 4.0],
+            }
+        )
+        make_imputers = lambda: [
+            GroupStatisticImputer(strategy, ["Group", "Sub"], ["X", "Y"]),
+            GroupStatisticImputer(strategy, ["Group"], "X"),
+        ]
+        expected = impute_missing_values(df.copy(), make_imputers())
+        left = IncrementalGroupStatisticImputer(strategy, ["Group", "Sub"], ["X", "Y"])
+        right = IncrementalGroupStatisticImputer(strategy, ["Group", "Sub"], ["X", "Y"])
+        merged = left.partial_fit(df[:3]).merge(right.partial_fit(df[3:]))
+        pd.testing.assert_frame_equal(
+            merged.statistics_.sort_index(),
+            make_imputers()[0].fit(df).statistics_,
+            check_index_type=False,
+        )
+
+        df.to_csv(tmp_path / "input.csv", index=False)
+        impute_csv_streaming(
+            tmp_path / "input.csv", tmp_path / "output.csv", make_imputers(), chunksize=3
+        )
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "output.csv"), expected)
+
+
+class TestProfiling:
+    def test_profiler_reports_filled_cells(self, tmp_path):
+        df = pd.DataFrame(
+            {"Group": ["A", "A", "B"], "X": [1, None, None], "Y": [None, None, "y"]}
+        )
+        profiler = ImputationProfiler()
+        impute_missing_values(
+            df,
+            [
+                GroupStatisticImputer("mean", "Group", "X"),
+                ConstantImputer(["X", "Y"], "Missing"),
+            ],
+            callbacks=[profiler],
+        )
+        summary = profiler.summary()
+        assert summary["cells_filled"] == 4
+        assert [p["cells_filled"] for p in summary["imputers"]] == [1, 3]
+        assert summary["imputers"][1]["columns_touched"] == ["X", "Y"]
+        assert summary["imputers"][0]["peak_memory_bytes"] > 0
+        path = tmp_path / "profile.json"
+        profiler.to_json(str(path))
+        assert json.loads(path.read_text()) == json.loads(profiler.to_json())
+
+    def test_caller_tracing_session_is_left_alone(self):
+        df = pd.DataFrame({"X": [1, None]})
+        tracemalloc.start()
+        try:
+            block = bytearray(10_000_000)
+            del block
+            _, peak = tracemalloc.get_traced_memory()
+            profiler = ImputationProfiler()
+            impute_missing_values(df, ConstantImputer("X", 0), callbacks=[profiler])
+            assert tracemalloc.is_tracing()
+            assert tracemalloc.get_traced_memory()[1] >= peak >= 10_000_000
+        finally:
+            tracemalloc.stop()
+        assert profiler.profiles[0].peak_memory_bytes is None
+
+    def test_callbacks_require_sequential_run(self):
+        df = pd.DataFrame({"X": [1, None]})
+        with pytest.raises(ValueError):
+            impute_missing_values(
+                df, ConstantImputer("X", 0), n_jobs=2, callbacks=[ImputerCallback()]
+            )
+
+
+class TestColumnarIO:
+    @pytest.mark.parametrize("suffix", ["parquet", "feather"])
+    def test_projection_and_write_back(self, tmp_path, suffix):
+        pytest.importorskip("pyarrow")
+        df = pd.DataFrame(
+            {"Group": ["A", "A", "B"], "X": [1.0, None, 3.0], "Id": [1, 2, 3], "Z": [None] * 3}
+        )
+        input_path, output_path = tmp_path / f"in.{suffix}", tmp_path / f"out.{suffix}"
+        getattr(df, f"to_{suffix}")(input_path)
+        imputers = [GroupStatisticImputer("mean", "Group", "X")]
+        impute_file(str(input_path), str(output_path), imputers, pass_through=["Id"])
+        result = getattr(pd, f"read_{suffix}")(output_path)
+        expected = pd.DataFrame({"Group": ["A", "A", "B"], "X": [1.0, 1.0, 3.0], "Id": [1, 2, 3]})
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_loaded_imputers_are_not_refit(self, tmp_path):
+        train = pd.DataFrame({"X": [10.0, 20.0]})
+        save_imputers([StatisticsImputer(["X"], "mean").fit(train)], tmp_path / "imputers.pkl")
+        pd.DataFrame({"X": [1.0, None]}).to_csv(tmp_path / "in.csv", index=False)
+        columnar_io_main(
+            [
+                str(tmp_path / "in.csv"),
+                str(tmp_path / "out.csv"),
+                "--imputers",
+                str(tmp_path / "imputers.pkl"),
+            ]
+        )
+        assert pd.read_csv(tmp_path / "out.csv")["X"].tolist() == [1.0, 15.0]
+
+    def test_csv_schema_covers_the_whole_file(self, tmp_path):
+        # Y is only filled after the first rows, so a sampled schema types it float
+        df = pd.DataFrame({"X": np.arange(3_000.0), "Y": [None] * 2_000 + ["y"] * 1_000})
+        df.loc[::2, "X"] = None
+        df.to_csv(tmp_path / "in.csv", index=False)
+        config = {
+            "imputers": [
+                {"type": "constant", "features": {"dtypes": ["number"]}, "fill_value": 0},
+                {"type": "constant", "features": {"dtypes": ["object"]}, "fill_value": "M"},
+            ]
+        }
+        (tmp_path / "config.json").write_text(json.dumps(config))
+        run_pipeline(
+            str(tmp_path / "config.json"), str(tmp_path / "in.csv"), str(tmp_path / "out.csv")
+        )
+        result = pd.read_csv(tmp_path / "out.csv")
+        assert result["Y"].tolist() == ["M"] * 2_000 + ["y"] * 1_000
+        assert result["X"].isna().sum() == 0
+
+    def test_missing_pyarrow_names_the_extra(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+        with pytest.raises(ImportError, match=r"\[io\]"):
+            read_frame(str(tmp_path / "in.parquet"))
+
+
+class TestPipelineConfig:
+    def setup_method(self):
+        self.df = pd.DataFrame(
+            {"Group": ["A", "A", "B"], "X": [1.0, None, 3.0], "Y": ["y", None, None]}
+        )
+        self.config = {
+            "imputers": [
+                {
+                    "type": "group_statistic",
+                    "strategy": "mean",
+                    "group_feature": "Group",
+                    "target_feature": "X",
+                },
+                {"type": "constant", "features": {"dtypes": ["object"]}, "fill_value": "M"},
+            ]
+        }
+
+    def test_compiled_pipeline_matches_imputers(self, tmp_path):
+        compiled = load_compiled_pipeline(self.config, self.df.iloc[:0], str(tmp_path))
+        assert compiled.steps[1]["params"]["features"] == ["Group", "Y"]
+        cached = load_compiled_pipeline(self.config, self.df.iloc[:0], str(tmp_path))
+        assert cached == compiled
+        result = impute_missing_values(self.df.copy(), cached.build_imputers())
+        expected = impute_missing_values(
+            self.df.copy(),
+            [
+                GroupStatisticImputer("mean", "Group", "X"),
+                ConstantImputer(["Group", "Y"], "M"),
+            ],
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_invalid_config(self):
+        self.config["imputers"][0]["target_feature"] = "Y"
+        with pytest.raises(ValueError):
+            compile_pipeline(self.config, self.df)
+        self.config["imputers"][0]["target_feature"] = "Missing"
+        with pytest.raises(ValueError):
+            compile_pipeline(self.config, self.df)
+
+    def test_missing_pyyaml_names_the_extra(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(sys.modules, "yaml", None)
+        (tmp_path / "config.yaml").write_text("imputers: []")
+        with pytest.raises(ImportError, match=r"\[config\]"):
+            load_config(str(tmp_path / "config.yaml"))
+
+
+class TestSharded:
+    def test_sharded_matches_in_memory(self, tmp_path):
+        df = pd.DataFrame(
+            {
+                "Group": ["A", "B", "A", "B", "A", "B", "C", "C"],
+                "X": [1.0, None, 3.0, 4.0, None, 2.0, None, 5.0],
+                "Y": ["u", None, "v", "v", None, "u", "u", None],
+                "Z": [None, 1.5, 2.5, None, 0.5, 3.5, None, 1.0],
+            }
+        )
+        imputers = lambda: [
+            GroupStatisticImputer("median", "Group", "X"),
+            ConstantImputer(["Z"], 0.5),
+            StatisticsImputer(["Y"], "most_frequent"),
+            StatisticsImputer(["X", "Z"], "mean"),
+        ]
+        # Partitions of the same name in date directories
+        paths = []
+        for i, start in enumerate(range(0, len(df), 3)):
+            (tmp_path / "in" / f"date={i}").mkdir(parents=True)
+            paths.append(str(tmp_path / "in" / f"date={i}" / "part.csv"))
+            df.iloc[start : start + 3].to_csv(paths[-1], index=False)
+        output_paths = impute_files_sharded(
+            paths, str(tmp_path / "out"), imputers(), n_jobs=2
+        )
+        assert output_paths == [
+            str(tmp_path / "out" / f"date={i}" / "part.csv") for i in range(3)
+        ]
+        result = pd.concat(
+            [pd.read_csv(path) for path in output_paths], ignore_index=True
+        )
+        expected = impute_missing_values(df.copy(), imputers())
+        pd.testing.assert_frame_equal(result, expected)
+
+
+class TestMicroBatchImputer:
+    def test_callers_get_their_own_rows(self):
+        df = pd.DataFrame(
+            {"Group": ["A", "A", "B", "B"], "X": [1.0, 3.0, 5.0, None], "Y": ["u", None, "v", None]}
+        )
+        imputers = fit_imputers(
+            df,
+            [
+                GroupStatisticImputer("mean", "Group", "X"),
+                ConstantImputer(["Y"], "Missing"),
+            ],
+        )
+
+        async def run():
+            async with MicroBatchImputer(imputers, max_wait=0.05) as service:
+                results = await asyncio.gather(
+                    service.impute({"Group": "A", "X": None, "Y": "w"}),
+                    service.impute({"Group": "B", "X": None, "Y": None}),
+                    service.impute({"Group": None, "X": None, "Y": None}),
+                    return_exceptions=True,
+                )
+                return results, service.batch_sizes
+
+        results, batch_sizes = asyncio.run(run())
+        assert results[0] == {"Group": "A", "X": 2.0, "Y": "w"}
+        assert results[1] == {"Group": "B", "X": 5.0, "Y": "Missing"}
+        assert isinstance(results[2], ValueError)
+        assert batch_sizes == [3]
+
+    def test_stop_imputes_queued_records(self):
+        imputers = fit_imputers(
+            pd.DataFrame({"X": [1.0, 3.0]}), [StatisticsImputer(["X"], "mean")]
+        )
+
+        async def run():
+            service = MicroBatchImputer(imputers, max_batch_size=2, max_wait=10)
+            await service.start()
+            tasks = [
+                asyncio.create_task(service.impute({"X": value}))
+                for value in [None, 5.0, None]
+            ]
+            # Let the callers queue their records, then stop before max_wait
+            await asyncio.sleep(0.01)
+            await asyncio.wait_for(service.stop(), timeout=5)
+            results = await asyncio.wait_for(asyncio.gather(*tasks), timeout=5)
+            with pytest.raises(ValueError):
+                await service.impute({"X": None})
+            return results, service.batch_sizes
+
+        results, batch_sizes = asyncio.run(run())
+        assert results == [{"X": 2.0}, {"X": 5.0}, {"X": 2.0}]
+        assert batch_sizes == [2, 1]
+
+    def test_callers_keep_their_columns_and_dtypes(self):
+        imputers = fit_imputers(
+            pd.DataFrame({"X": [1.0, 3.0]}), [StatisticsImputer(["X"], "mean")]
+        )
+
+        async def run():
+            async with MicroBatchImputer(imputers, max_wait=0.05) as service:
+                return await asyncio.gather(
+                    service.impute({"X": 1, "Y": "u"}),
+                    service.impute({"X": None}),
+                    service.impute({"X": None, "Y": None}),
+                    service.impute_records([{"X": 4}, {"X": 5}]),
+                )
+
+        results = asyncio.run(run())
+        assert results[:3] == [{"X": 1, "Y": "u"}, {"X": 2.0}, {"X": 2.0, "Y": None}]
+        assert type(results[0]["X"]) is int
+        assert results[3] == [{"X": 4}, {"X": 5}]
+        assert all(type(row["X"]) is int for row in results[3])
+
+
+class TestSampling:
+    def test_small_groups_are_exact(self):
+        df = pd.DataFrame({"Group": ["A", "A", "B"], "X": [1.0, 3.0, None], "Y": [1.0, None, 4.0]})
+        exact = GroupStatisticImputer("median", "Group", ["X", "Y"]).fit(df)
+        sampled = GroupStatisticImputer("median", "Group", ["X", "Y"], sample_size=10).fit(df)
+        for target in ["X", "Y"]:
+            pd.testing.assert_series_equal(
+                sampled.statistics_[target], exact.statistics_[target]
+            )
+            assert sampled.bounds_[target]["exact"].all()
+        imputer = StatisticsImputer(["X", "Y"], "mean", sample_size=10).fit(df)
+        assert imputer.statistics_.to_dict() == {"X": 2.0, "Y": 2.5}
+        assert imputer.bounds_["exact"].all()
+
+    def test_bounds_contain_the_exact_statistic(self):
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame(
+            {"Group": rng.integers(0, 3, 30_000), "X": rng.normal(10, 2, 30_000)}
+        )
+        for strategy in ["mean", "median"]:
+            exact = GroupStatisticImputer(strategy, "Group", ["X"]).fit(df).statistics_["X"]
+            imputer = GroupStatisticImputer(strategy, "Group", ["X"], sample_size=2_000)
+            bounds = imputer.fit(df).bounds_["X"]
+            assert (bounds["sample_size"] < bounds["population_size"]).all()
+            assert (bounds["lower"] <= exact).all() and (exact <= bounds["upper"]).all()
+        bounds = StatisticsImputer(["X"], "mean", sample_size=2_000).fit(df).bounds_
+        assert bounds.loc["X", "lower"] <= df["X"].mean() <= bounds.loc["X", "upper"]
+
+    def test_seeded(self):
+        df = pd.DataFrame({"Group": [0, 1] * 500, "X": np.arange(1_000.0)})
+        first, second = (
+            GroupStatisticImputer("median", "Group", "X", sample_size=50, random_state=7).fit(df)
+            for _ in range(2)
+        )
+        pd.testing.assert_series_equal(first.statistics_, second.statistics_)
+        with pytest.raises(ValueError):
+            GroupStatisticImputer("median", "Group", "X", sample_size=0)
+
+    def test_planning_and_sharding_keep_samples(self):
+        rng = np.random.default_rng(2)
+        df = pd.DataFrame(rng.normal(size=(1_000, 3)), columns=["X", "Y", "Z"])
+        df.iloc[::7, 1:] = np.nan
+        imputers = [
+            ConstantImputer(features=["X"], fill_value=0),
+            StatisticsImputer(["X", "Y", "Z"], "median", sample_size=50, random_state=3),
+        ]
+        expected = impute_missing_values(df.copy(), imputers)
+        fused = impute_missing_values(df.copy(), plan_imputers(imputers).steps)
+        indexed = impute_missing_values(
+            df.copy(), imputers, missing_index=MissingIndex(df)
+        )
+        parallel = impute_missing_values(df.copy(), imputers, n_jobs=2)
+        for result in (fused, indexed, parallel):
+            pd.testing.assert_frame_equal(result, expected)
+
+
+class TestDowncast:
+    def test_smallest_safe_dtypes(self):
+        df = pd.DataFrame(
+            {
+                "Small": [1, -2, 3],
+                "Count": [0, 200, 255],
+                "Large": [0, 70_000, 5],
+                "Area": [1.5, None, 3.0],
+                "Price": [0.1, None, 0.2],
+                "Name": ["a", None, "c"],
+            }
+        )
+        report = DowncastReport()
+        df = downcast_dtypes(df, report=report)
+        assert df.dtypes.astype(str).to_dict() == {
+            "Small": "int8",
+            "Count": "uint8",
+            "Large": "int32",
+            "Area": "float32",
+            "Price": "float64",
+            "Name": "object",
+        }
+        assert report.memory_saved == 3 * (7 + 7 + 4 + 4)
+
+    def test_fill_values_fit(self):
+        df = pd.DataFrame({"X": [1.0, None], "Y": [1.0, None], "Z": [2.0, None]})
+        imputers = [
+            ConstantImputer(["X"], 1e40),
+            StatisticsImputer(["Y"], "mean"),
+            StatisticsImputer(["Z"], "median"),
+        ]
+        df = downcast_dtypes(df, imputers)
+        assert df.dtypes.astype(str).tolist() == ["float64", "float64", "float32"]
+
+    def test_imputation_matches_on_downcast_dtypes(self):
+        df = pd.DataFrame(
+            {
+                "MSSubClass": [20, 20, 60, 60],
+                "Neighborhood": ["A", "A", "A", "B"],
+                "LotFrontage": [60.0, 71.0, None, 81.0],
+                "MasVnrArea": [None, 2.0, 3.0, 4.0],
+                "GarageArea": [1, 2, 3, 4],
+            }
+        )
+
+        def build(df):
+            return [
+                GroupStatisticImputer("median", "Neighborhood", "LotFrontage"),
+                ConstantImputer(df.select_dtypes(include=["number"]).columns, 0),
+            ]
+
+        expected = impute_missing_values(df.copy(), build(df))
+        downcast = downcast_dtypes(df.copy(), build(df))
+        result = impute_missing_values(downcast, build(downcast))
+        assert result["GarageArea"].dtype == "int8"
+        assert result["LotFrontage"].dtype == "float32"
+        assert result.loc[2, "LotFrontage"] == 65.5
+        pd.testing.assert_frame_equal(result.astype(expected.dtypes), expected)
+
+
+class TestWorker:
+    def setup_method(self):
+        self.df = pd.DataFrame({"Group": ["A", "A", "B"], "X": [1.0, None, 3.0]})
+        self.imputers = [GroupStatisticImputer("mean", "Group", "X")]
+        self.expected = pd.DataFrame({"Group": ["A", "A", "B"], "X": [1.0, 1.0, 3.0]})
+
+    def test_stdio_jobs(self, tmp_path):
+        self.df.to_csv(tmp_path / "in.csv", index=False)
+        save_imputers(fit_imputers(self.df, self.imputers), str(tmp_path / "imputers.pkl"))
+        requests = [
+            {"command": "ping"},
+            {
+                "input": str(tmp_path / "in.csv"),
+                "output": str(tmp_path / "out.csv"),
+                "imputers": str(tmp_path / "imputers.pkl"),
+            },
+            {"input": str(tmp_path / "missing.csv"), "output": str(tmp_path / "x.csv")},
+            {"command": "stop"},
+            {"command": "ping"},
+        ]
+        stdout = io.StringIO()
+        serve_stdio(
+            ImputationWorker(),
+            io.StringIO("".join(json.dumps(request) + "\n" for request in requests)),
+            stdout,
+        )
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        assert [response["ok"] for response in responses] == [True, True, False, True]
+        assert responses[1]["null_count"] == 0
+        assert responses[3]["jobs_run"] == 1
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "out.csv"), self.expected)
+
+    def test_socket_jobs_reuse_the_plan(self, tmp_path):
+        self.df.to_csv(tmp_path / "in.csv", index=False)
+        step = {
+            "type": "group_statistic",
+            "strategy": "mean",
+            "group_feature": "Group",
+            "target_feature": "X",
+        }
+        config = {"imputers": [step]}
+        (tmp_path / "config.json").write_text(json.dumps(config))
+        worker = ImputationWorker(configs=[str(tmp_path / "config.json")])
+        socket_path = str(tmp_path / "worker.sock")
+        with WorkerServer(socket_path, worker) as server:
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            jobs = [
+                {
+                    "input": str(tmp_path / "in.csv"),
+                    "output": str(tmp_path / f"out{i}.csv"),
+                    "config": str(tmp_path / "config.json"),
+                }
+                for i in range(2)
+            ]
+            responses = submit(socket_path, jobs)
+            submit(socket_path, [{"command": "stop"}])
+            thread.join(timeout=10)
+        assert all(response["ok"] for response in responses)
+        assert len(worker._plans) == 1
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "out1.csv"), self.expected)
+
+
+class TestRandomImputer:
+    def test_draws_are_seeded_and_observed(self):
+        df = pd.DataFrame({"X": [1.0, None, 2.0, None, None], "Y": ["a", None, "a", "b", None]})
+        first = RandomImputer(["X", "Y"], random_state=3).impute(df.copy())
+        second = RandomImputer(["X", "Y"], random_state=3).impute(df.copy())
+        pd.testing.assert_frame_equal(first, second)
+        assert first["X"].isin([1.0, 2.0]).all()
+        assert first["Y"].isin(["a", "b"]).all()
+
+    def test_weighted_draws_follow_value_counts(self):
+        values = pd.Series(["a"] * 900 + ["b"] * 100 + [None] * 20_000)
+        for weighted, expected in [(True, 0.9), (False, 0.5)]:
+            df = pd.DataFrame({"X": values})
+            df = RandomImputer(["X"], weighted=weighted).impute(df)
+            share = (df["X"].iloc[1_000:] == "a").mean()
+            assert abs(share - expected) < 0.02
+
+    def test_batches_get_fresh_draws(self):
+        train = pd.DataFrame({"X": ["a"] * 90 + ["b"] * 10})
+        batch = pd.DataFrame({"X": [None] * 20})
+
+        def fill_batches(imputer):
+            return pd.concat(
+                [imputer.transform(batch, inplace=False)["X"] for _ in range(100)],
+                ignore_index=True,
+            )
+
+        imputer = RandomImputer(["X"], random_state=1).fit(train)
+        draws = fill_batches(imputer)
+        assert abs((draws == "a").mean() - 0.9) < 0.03
+        batches = draws.to_numpy().reshape(100, 20)
+        assert len({tuple(row) for row in batches}) > 1
+        # Refitting reseeds, so the same batches are filled the same way
+        pd.testing.assert_series_equal(fill_batches(imputer.fit(train)), draws)
+
+    def test_groups(self):
+        df = pd.DataFrame(
+            {"Group": ["A", "A", "B", "B", "C"], "X": ["u", None, "v", None, None]}
+        )
+        imputer = RandomImputer(["X"], group_feature="Group").fit(df)
+        assert imputer.statistics_["X"].to_dict() == {("A", "u"): 1, ("B", "v"): 1}
+        result = transform_missing_values(df, imputer, inplace=False)
+        assert result["X"].tolist()[:4] == ["u", "u", "v", "v"]
+        assert pd.isna(result.loc[4, "X"])
+        missing_index = MissingIndex(df)
+        impute_missing_values(df, [RandomImputer(["X"], "Group")], missing_index=missing_index)
+        assert missing_index.null_count == 1
@@ -6,4 +6,6 @@ import pandas as pd
 def check_variables_is_list(variables: Union[Any, Iterable[Any]]) -> Iterable[Any]:
     if isinstance(variables, list):
         return variables
+    if isinstance(variables, Iterable) and not isinstance(variables, str):
+        return list(variables)
     return [variables]
@@ -0,0 +1,198 @@
+import argparse
+import importlib.util
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from typing import Optional, TextIO
+from columnar_io import get_required_features, read_frame, read_schema, write_frame
+from downcast import DowncastReport, downcast_dtypes
+from pipeline_config import compile_pipeline, get_schema_key, load_config
+from process_data import (
+    DataFrameImputer,
+    MissingIndex,
+    get_default_imputers,
+    impute_missing_values,
+    load_imputers,
+    transform_missing_values,
+)
+
+
+class ImputationWorker:
+    # Runs imputation jobs in a long-lived interpreter. Configs and pickled
+    # imputers are loaded once per file version, and a config is compiled
+    # once per input schema, so a job only pays for reading, imputing and
+    # writing its own file.
+    #
+    # A job is {"input": path, "output": path} with optionally "config" (a
+    # pipeline config, fitted on the file), "imputers" (a pickle written by
+    # save_imputers, only transformed), "pass_through" and "downcast".
+    # Without config or imputers, the default pipeline is fitted on the file.
+    def __init__(
+        self,
+        configs: Optional[list[str]] = None,
+        imputers: Optional[list[str]] = None,
+    ):
+        self._configs = {}
+        self._imputers = {}
+        self._plans = {}
+        self.jobs_run = 0
+        for path in configs or []:
+            self._load_config(path)
+        for path in imputers or []:
+            self._load_imputers(path)
+        _warm_up()
+
+    def _load_config(self, path: str) -> dict:
+        # Keyed by modification time, so edited files are picked up
+        key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+        if key not in self._configs:
+            self._configs[key] = load_config(path)
+        return self._configs[key]
+
+    def _load_imputers(self, path: str) -> list[DataFrameImputer]:
+        key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+        if key not in self._imputers:
+            self._imputers[key] = load_imputers(path)
+        return self._imputers[key]
+
+    def _get_imputers(self, job: dict, schema) -> tuple[list[DataFrameImputer], bool]:
+        # The imputers of a job, and whether they are fitted on its file
+        if job.get("config") and job.get("imputers"):
+            raise ValueError("A job takes a config or imputers, not both")
+        if job.get("imputers"):
+            return self._load_imputers(job["imputers"]), False
+        if not job.get("config"):
+            return get_default_imputers(schema), True
+        config = self._load_config(job["config"])
+        key = get_schema_key(config, schema)
+        if key not in self._plans:
+            self._plans[key] = compile_pipeline(config, schema)
+        return self._plans[key].build_imputers(), True
+
+    def run_job(self, job: dict) -> dict:
+        start = time.perf_counter()
+        for name in ("input", "output"):
+            if not isinstance(job.get(name), str):
+                raise ValueError(f"The job has no {name} path")
+        schema = read_schema(job["input"])
+        imputers, fit = self._get_imputers(job, schema)
+        required = set(get_required_features(imputers, list(schema.columns)))
+        required.update(job.get("pass_through", []))
+        columns = [column for column in schema.columns if column in required]
+        df = read_frame(job["input"], columns)
+        result = {}
+        if job.get("downcast"):
+            report = DowncastReport()
+            df = downcast_dtypes(df, imputers, report=report)
+            result["memory_saved_bytes"] = report.memory_saved
+        if fit:
+            missing_index = MissingIndex(df)
+            df = impute_missing_values(df, imputers, missing_index=missing_index)
+        else:
+            df = transform_missing_values(df, imputers)
+            missing_index = MissingIndex(df)
+        write_frame(df, job["output"])
+        self.jobs_run += 1
+        return {
+            "ok": True,
+            "output": job["output"],
+            "rows": len(df),
+            "null_count": missing_index.null_count,
+            "seconds": time.perf_counter() - start,
+            **result,
+        }
+
+    def handle_line(self, line: str) -> tuple[dict, bool]:
+        # The response to one request line, and whether the worker stops.
+        # A failed job only fails its own response.
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise ValueError("A request must be a JSON object")
+            if message.get("command") == "stop":
+                return {"ok": True, "jobs_run": self.jobs_run}, True
+            if message.get("command") == "ping":
+                return {"ok": True, "jobs_run": self.jobs_run}, False
+            return self.run_job(message), False
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}, False
+
+
+def _warm_up():
+    # columnar_io imports pyarrow on the first Parquet or Feather file
+    if importlib.util.find_spec("pyarrow") is not None:
+        import pyarrow.feather  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+
+
+def serve_stdio(worker: ImputationWorker, stdin: TextIO, stdout: TextIO):
+    # One JSON request per line in, one JSON response per line out, until a
+    # stop request or the end of the input
+    for line in stdin:
+        if not line.strip():
+            continue
+        response, stop = worker.handle_line(line)
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+        if stop:
+            return
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response, stop = self.server.worker.handle_line(line.decode())
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+            if stop:
+                # shutdown waits for serve_forever, which runs this handler
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+
+class WorkerServer(socketserver.UnixStreamServer):
+    # Serves one connection at a time, so jobs run one after another in the
+    # warm interpreter and waiting clients queue on the socket
+    def __init__(self, path: str, worker: ImputationWorker):
+        if os.path.exists(path):
+            os.unlink(path)
+        self.worker = worker
+        super().__init__(path, _JobHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Keep an imputation worker warm and run jobs sent to it"
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--socket", help="Path of the Unix socket to listen on")
+    source.add_argument(
+        "--stdio", action="store_true", help="Read jobs from stdin, answer on stdout"
+    )
+    parser.add_argument("--config", nargs="+", default=[], help="Configs to preload")
+    parser.add_argument(
+        "--imputers", nargs="+", default=[], help="Imputer pickles to preload"
+    )
+    args = parser.parse_args(argv)
+
+    worker = ImputationWorker(args.config, args.imputers)
+    if args.stdio:
+        serve_stdio(worker, sys.stdin, sys.stdout)
+        return
+    with WorkerServer(args.socket, worker) as server:
+        print(f"Listening on {args.socket}", file=sys.stderr, flush=True)
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Optional
+
+# Only the standard library is imported, so a client starts in milliseconds
+# and the pandas import is paid once, by the worker
+
+
+def submit(socket_path: str, requests: list[dict]) -> list[dict]:
+    # Sends the requests over one connection and returns a response for each
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        payload = "".join(json.dumps(request) + "\n" for request in requests)
+        connection.sendall(payload.encode())
+        with connection.makefile("rb") as responses:
+            return [json.loads(responses.readline()) for _ in requests]
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Submit a job to an imputation worker")
+    parser.add_argument("--socket", required=True, help="Unix socket of the worker")
+    parser.add_argument("input", nargs="?")
+    parser.add_argument("output", nargs="?")
+    plan = parser.add_mutually_exclusive_group()
+    plan.add_argument("--config", help="Pipeline config, default pipeline if unset")
+    plan.add_argument("--imputers", help="Pickle written by save_imputers")
+    parser.add_argument("--pass-through", nargs="+", default=[])
+    parser.add_argument("--downcast", action="store_true")
+    parser.add_argument(
+        "--stop", action="store_true", help="Stop the worker instead of running a job"
+    )
+    args = parser.parse_args(argv)
+
+    if args.stop:
+        request = {"command": "stop"}
+    elif args.input is None or args.output is None:
+        parser.error("input and output are required")
+    else:
+        # The worker may run in another directory
+        request = {
+            "input": os.path.abspath(args.input),
+            "output": os.path.abspath(args.output),
+            "config": args.config and os.path.abspath(args.config),
+            "imputers": args.imputers and os.path.abspath(args.imputers),
+            "pass_through": args.pass_through,
+            "downcast": args.downcast,
+        }
+    (response,) = submit(args.socket, [request])
+    print(json.dumps(response))
+    if not response["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
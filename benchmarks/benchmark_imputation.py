@@ -0,0 +1,351 @@
+import argparse
+import importlib.util
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+TRAIN_PATH = ROOT / "data" / "train.csv"
+STAGES = [
+    "0_initial",
+    "1_remove_redundant_code",
+    "2_split_into_smaller_units",
+    "3_remove_duplicates",
+    "4_make_extendable",
+    "5_handle_edge_cases",
+]
+GROUP_FEATURES = ["MSSubClass", "Neighborhood"]
+
+
+def load_stage(stage: str):
+    # Every stage has its own process_data.py, so each one is loaded under a
+    # unique module name with its directory on the path for sibling imports
+    stage_dir = ROOT / stage
+    sys.path.insert(0, str(stage_dir))
+    try:
+        spec = importlib.util.spec_from_file_location(
+            f"{stage}_process_data", stage_dir / "process_data.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(str(stage_dir))
+    return module
+
+
+def make_synthetic_frame(
+    n_rows: int,
+    missing_rate: float = 0.05,
+    group_cardinality: Optional[int] = None,
+    seed: int = 0,
+    string_dtype: str = "object",
+) -> pd.DataFrame:
+    # Rows are resampled from train.csv so dtypes and value distributions match
+    rng = np.random.default_rng(seed)
+    template = pd.read_csv(TRAIN_PATH)
+    df = template.sample(n_rows, replace=True, random_state=seed).reset_index(
+        drop=True
+    )
+    if group_cardinality is not None:
+        df["MSSubClass"] = rng.integers(0, group_cardinality, n_rows) * 10
+        df["Neighborhood"] = "N" + rng.integers(0, group_cardinality, n_rows).astype(
+            str
+        ).astype(object)
+    for column in df.columns.drop(GROUP_FEATURES):
+        df[column] = df[column].mask(rng.random(n_rows) < missing_rate)
+    if string_dtype != "object":
+        string_features = df.select_dtypes(include=["object"]).columns
+        df[string_features] = df[string_features].astype(string_dtype)
+    return df
+
+
+def build_stage_imputers(module, df: pd.DataFrame) -> list:
+    # The stage-5 __main__ pipeline, built from the given stage's classes
+    categorical_features = list(
+        df.select_dtypes(include=["object", "category", "string"]).columns
+    )
+    numerical_features = list(df.select_dtypes(include=["int64", "float64"]).columns)
+    return [
+        module.GroupStatisticImputer(
+            strategy="most_frequent",
+            group_feature="MSSubClass",
+            target_feature="MSZoning",
+        ),
+        module.GroupStatisticImputer(
+            strategy="median",
+            group_feature="Neighborhood",
+            target_feature="LotFrontage",
+        ),
+        module.ConstantImputer(features=["Functional"], fill_value="Typ"),
+        module.ConstantImputer(
+            features=[
+                "Alley",
+                "GarageType",
+                "GarageFinish",
+                "GarageQual",
+                "GarageCond",
+                "BsmtQual",
+                "BsmtCond",
+                "BsmtExposure",
+                "BsmtFinType1",
+                "BsmtFinType2",
+                "FireplaceQu",
+                "PoolQC",
+                "Fence",
+                "MiscFeature",
+            ],
+            fill_value="Missing",
+        ),
+        module.ConstantImputer(features=numerical_features, fill_value=0),
+        module.StatisticsImputer(
+            features=categorical_features, strategy="most_frequent"
+        ),
+    ]
+
+
+def get_benchmarks(df: pd.DataFrame) -> dict[str, Callable[[pd.DataFrame], object]]:
+    benchmarks = {}
+    for stage in STAGES:
+        module = load_stage(stage)
+        if hasattr(module, "DataFrameImputer"):
+            imputers = build_stage_imputers(module, df)
+            benchmarks[f"stage/{stage}"] = (
+                lambda df, module=module, imputers=imputers: module.impute_missing_values(
+                    df, imputers
+                )
+            )
+        else:
+            benchmarks[f"stage/{stage}"] = module.impute_missing_values
+
+    # Each stage-5 imputer class on its own
+    module = load_stage(STAGES[-1])
+    for engine in ["vectorized", "transform"]:
+        for strategy in ["mean", "median", "most_frequent"]:
+            imputer = module.GroupStatisticImputer(
+                strategy=strategy,
+                group_feature="Neighborhood",
+                target_feature="MSZoning" if strategy == "most_frequent" else "LotFrontage",
+                engine=engine,
+            )
+            benchmarks[f"imputer/GroupStatisticImputer/{engine}/{strategy}"] = (
+                imputer.impute
+            )
+    categorical_features = list(
+        df.select_dtypes(include=["object", "category", "string"]).columns
+    )
+    numerical_features = list(df.select_dtypes(include=["int64", "float64"]).columns)
+    benchmarks["imputer/ConstantImputer/categorical"] = module.ConstantImputer(
+        features=categorical_features, fill_value="Missing"
+    ).impute
+    benchmarks["imputer/ConstantImputer/numerical"] = module.ConstantImputer(
+        features=numerical_features, fill_value=0
+    ).impute
+    benchmarks["imputer/StatisticsImputer/most_frequent"] = module.StatisticsImputer(
+        features=categorical_features, strategy="most_frequent"
+    ).impute
+    for strategy in ["mean", "median"]:
+        benchmarks[f"imputer/StatisticsImputer/{strategy}"] = module.StatisticsImputer(
+            features=numerical_features, strategy=strategy
+        ).impute
+    return benchmarks
+
+
+def measure(
+    function: Callable[[pd.DataFrame], object], df: pd.DataFrame, repeat: int
+) -> dict:
+    timings = []
+    for _ in range(repeat):
+        df_ = df.copy()
+        start = time.perf_counter()
+        function(df_)
+        timings.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate run so tracing does not skew the timings
+    df_ = df.copy()
+    tracemalloc.start()
+    try:
+        function(df_)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": min(timings),
+        "mean_seconds": sum(timings) / len(timings),
+        "peak_memory_bytes": peak,
+    }
+
+
+def get_metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def run_benchmarks(
+    sizes: list[int],
+    missing_rates: list[float],
+    group_cardinalities: list[Optional[int]],
+    repeat: int = 3,
+    pattern: Optional[str] = None,
+    string_dtypes: tuple[str, ...] = ("object",),
+) -> dict:
+    results = []
+    cases = itertools.product(sizes, missing_rates, group_cardinalities, string_dtypes)
+    for n_rows, missing_rate, group_cardinality, string_dtype in cases:
+        df = make_synthetic_frame(
+            n_rows, missing_rate, group_cardinality, string_dtype=string_dtype
+        )
+        frame_memory = int(df.memory_usage(deep=True).sum())
+        for name, function in get_benchmarks(df).items():
+            if pattern is not None and pattern not in name:
+                continue
+            result = {
+                "benchmark": name,
+                "n_rows": n_rows,
+                "missing_rate": missing_rate,
+                "group_cardinality": group_cardinality,
+                "string_dtype": string_dtype,
+                "frame_memory_bytes": frame_memory,
+            }
+            try:
+                result.update(measure(function, df, repeat))
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+            results.append(result)
+            print(_format_result(result), flush=True)
+    return {"metadata": get_metadata(), "results": results}
+
+
+def _result_key(result: dict) -> tuple:
+    return (
+        result["benchmark"],
+        result["n_rows"],
+        result["missing_rate"],
+        result["group_cardinality"],
+        result.get("string_dtype", "object"),
+    )
+
+
+def _format_result(result: dict) -> str:
+    case = (
+        f"{result['benchmark']} n={result['n_rows']} missing={result['missing_rate']} "
+        f"groups={result['group_cardinality']} strings={result['string_dtype']}"
+    )
+    if "error" in result:
+        return f"{case}: {result['error']}"
+    return (
+        f"{case}: {result['seconds']:.4f}s, peak {result['peak_memory_bytes'] / 1e6:.1f} MB, "
+        f"frame {result['frame_memory_bytes'] / 1e6:.1f} MB"
+    )
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 1.1) -> list[dict]:
+    # Ratios above the threshold are reported as regressions
+    baseline_results = {
+        _result_key(result): result
+        for result in baseline["results"]
+        if "error" not in result
+    }
+    comparisons = []
+    for result in current["results"]:
+        old = baseline_results.get(_result_key(result))
+        if old is None or "error" in result:
+            continue
+        time_ratio = result["seconds"] / old["seconds"]
+        memory_ratio = result["peak_memory_bytes"] / max(old["peak_memory_bytes"], 1)
+        comparisons.append(
+            {
+                "benchmark": result["benchmark"],
+                "n_rows": result["n_rows"],
+                "missing_rate": result["missing_rate"],
+                "group_cardinality": result["group_cardinality"],
+                "string_dtype": result["string_dtype"],
+                "time_ratio": time_ratio,
+                "memory_ratio": memory_ratio,
+                "regression": time_ratio > threshold or memory_ratio > threshold,
+            }
+        )
+    return comparisons
+
+
+def _parse_cardinality(value: str) -> Optional[int]:
+    return None if value == "original" else int(value)
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the imputation pipeline of every refactoring stage"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--missing-rates", type=float, nargs="+", default=[0.05])
+    parser.add_argument(
+        "--group-cardinalities",
+        type=_parse_cardinality,
+        nargs="+",
+        default=[None],
+        help="Distinct values of the group features, or 'original' to keep train.csv's",
+    )
+    parser.add_argument(
+        "--string-dtypes",
+        nargs="+",
+        default=["object"],
+        choices=["object", "category", "string[pyarrow]"],
+        help="Representation of the string columns",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--filter", dest="pattern", help="Only run matching benchmarks")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.1)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.sizes,
+        args.missing_rates,
+        args.group_cardinalities,
+        repeat=args.repeat,
+        pattern=args.pattern,
+        string_dtypes=tuple(args.string_dtypes),
+    )
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        comparisons = compare_results(baseline, results, args.threshold)
+        for comparison in comparisons:
+            flag = "REGRESSION" if comparison["regression"] else "ok"
+            print(
+                f"{flag:>10} {comparison['benchmark']} n={comparison['n_rows']}: "
+                f"time x{comparison['time_ratio']:.2f}, memory x{comparison['memory_ratio']:.2f}"
+            )
+        if any(comparison["regression"] for comparison in comparisons):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
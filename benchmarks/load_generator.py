@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "5_handle_edge_cases"))
+
+from process_data import (  # noqa: E402
+    fit_imputers,
+    get_default_imputers,
+    transform_missing_values,
+)
+from service import MicroBatchImputer  # noqa: E402
+
+
+async def _client(submit, records: list[dict], latencies: list[float]):
+    for record in records:
+        start = time.perf_counter()
+        await submit(record)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_load(
+    submit, records: list[dict], concurrency: int
+) -> tuple[float, list[float]]:
+    # Every client sends its share of the records one at a time, so at most
+    # `concurrency` requests are in flight
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _client(submit, records[i::concurrency], latencies)
+            for i in range(concurrency)
+        )
+    )
+    return time.perf_counter() - start, latencies
+
+
+def summarize(name: str, seconds: float, latencies: list[float]) -> dict:
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "mode": name,
+        "requests": len(latencies),
+        "throughput": len(latencies) / seconds,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+async def main_async(
+    n_requests: int,
+    concurrency: int,
+    max_batch_size: int,
+    max_wait: float,
+    seed: int = 0,
+) -> list[dict]:
+    df = pd.read_csv(ROOT / "data" / "train.csv")
+    imputers = fit_imputers(df, get_default_imputers(df))
+    columns = list(df.columns)
+    records = (
+        df.sample(n_requests, replace=True, random_state=seed).to_dict("records")
+    )
+
+    async def impute_directly(record: dict) -> dict:
+        # One transform per request, the baseline without batching
+        frame = pd.DataFrame.from_records([record], columns=columns)
+        return transform_missing_values(frame, imputers).to_dict("records")[0]
+
+    results = [summarize("direct", *await run_load(impute_directly, records, concurrency))]
+    async with MicroBatchImputer(
+        imputers, max_batch_size=max_batch_size, max_wait=max_wait, columns=columns
+    ) as service:
+        results.append(
+            summarize("micro-batch", *await run_load(service.impute, records, concurrency))
+        )
+        results[-1]["mean_batch_size"] = float(np.mean(service.batch_sizes))
+    return results
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Throughput and latency of single-record imputation"
+    )
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait", type=float, default=0.005)
+    args = parser.parse_args(argv)
+    results = asyncio.run(
+        main_async(args.requests, args.concurrency, args.max_batch_size, args.max_wait)
+    )
+    for result in results:
+        print(
+            f"{result['mode']:>12}: {result['throughput']:.0f} requests/s, "
+            f"p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
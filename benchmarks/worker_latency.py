@@ -0,0 +1,140 @@
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+STAGE = ROOT / "5_handle_edge_cases"
+sys.path.insert(0, str(STAGE))
+
+from worker_client import submit  # noqa: E402
+
+
+def write_jobs(directory: Path, n_jobs: int, rows: int, seed: int = 0) -> list[Path]:
+    # Small files with the schema of train.csv, as a scheduler would send them
+    df = pd.read_csv(ROOT / "data" / "train.csv")
+    paths = []
+    for i in range(n_jobs):
+        path = directory / f"part-{i:04d}.csv"
+        df.sample(rows, random_state=seed + i).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def time_commands(commands: list[list[str]]) -> list[float]:
+    latencies = []
+    for command in commands:
+        start = time.perf_counter()
+        subprocess.run(command, check=True, capture_output=True)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(name: str, latencies: list[float]) -> dict:
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "mode": name,
+        "jobs": len(latencies),
+        "mean_ms": float(latencies_ms.mean()),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+def run(n_jobs: int, rows: int, config: Path) -> list[dict]:
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        inputs = write_jobs(directory, n_jobs, rows)
+        outputs = [directory / f"{path.stem}.parquet" for path in inputs]
+        # Cold: a new interpreter per file, with the on-disk plan cache warm
+        cold = [
+            [
+                sys.executable,
+                str(STAGE / "pipeline_config.py"),
+                "run",
+                str(config),
+                str(input_path),
+                str(output_path),
+                "--cache-dir",
+                str(directory / "plans"),
+            ]
+            for input_path, output_path in zip(inputs, outputs)
+        ]
+        time_commands(cold[:1])
+        results = [summarize("cold start", time_commands(cold))]
+
+        socket_path = str(directory / "worker.sock")
+        worker = subprocess.Popen(
+            [
+                sys.executable,
+                str(STAGE / "worker.py"),
+                "--socket",
+                socket_path,
+                "--config",
+                str(config),
+            ],
+            stderr=subprocess.PIPE,
+        )
+        try:
+            # The worker reports on stderr once it is listening
+            worker.stderr.readline()
+            jobs = [
+                {"input": str(input_path), "output": str(output_path), "config": str(config)}
+                for input_path, output_path in zip(inputs, outputs)
+            ]
+            submit(socket_path, jobs[:1])
+            # Warm, through the client command, as a scheduler would call it
+            client = [
+                [
+                    sys.executable,
+                    str(STAGE / "worker_client.py"),
+                    "--socket",
+                    socket_path,
+                    job["input"],
+                    job["output"],
+                    "--config",
+                    job["config"],
+                ]
+                for job in jobs
+            ]
+            results.append(summarize("warm client", time_commands(client)))
+            # Warm, from a caller that is already running
+            latencies = []
+            for job in jobs:
+                start = time.perf_counter()
+                (response,) = submit(socket_path, [job])
+                if not response["ok"]:
+                    raise RuntimeError(response["error"])
+                latencies.append(time.perf_counter() - start)
+            results.append(summarize("warm submit", latencies))
+            submit(socket_path, [{"command": "stop"}])
+            worker.wait(timeout=10)
+        finally:
+            if worker.poll() is None:
+                worker.kill()
+    return results
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Per-job latency of a warm worker against a cold start"
+    )
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--config", type=Path, default=STAGE / "pipeline.yaml")
+    args = parser.parse_args(argv)
+    results = run(args.jobs, args.rows, args.config)
+    for result in results:
+        print(
+            f"{result['mode']:>12}: mean {result['mean_ms']:.1f} ms, "
+            f"p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()